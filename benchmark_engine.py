@@ -0,0 +1,129 @@
+"""扫雷引擎性能基准：布雷、连锁揭示和胜利判定在不同棋盘尺寸与地雷密度下的吞吐量
+
+用法:
+    python benchmark_engine.py                       # 默认尺寸与密度
+    python benchmark_engine.py --sizes 100x60 1000x1000 --densities 0.1 0.2
+    python benchmark_engine.py --save baseline.json  # 保存结果作为基线
+    python benchmark_engine.py --compare baseline.json --tolerance 0.2
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from minesweeper_engine import MinesweeperEngine
+
+DEFAULT_SIZES = ["30x20", "100x60", "300x300", "1000x1000"]
+DEFAULT_DENSITIES = [0.05, 0.15, 0.25]
+
+
+def parse_size(text):
+    width, height = text.lower().split("x")
+    return int(width), int(height)
+
+
+def best_of(func, repeat):
+    """多次运行取最快的一次（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_config(width, height, density, repeat, seed=12345):
+    """返回一组配置下的各项吞吐量（单元格/秒或次/秒）"""
+    cells = width * height
+    cx, cy = width // 2, height // 2
+
+    def generate():
+        engine = MinesweeperEngine(width, height, density, seed=seed)
+        engine.place_mines(cx, cy)
+
+    # 连锁揭示：每轮使用相同种子的新棋盘，只计揭示本身的耗时
+    cascade_time = float("inf")
+    revealed = 0
+    for _ in range(repeat):
+        engine = MinesweeperEngine(width, height, density, seed=seed)
+        engine.place_mines(cx, cy)
+        engine.first_click = False
+        start = time.perf_counter()
+        changed = engine.reveal(cx, cy)
+        cascade_time = min(cascade_time, time.perf_counter() - start)
+        revealed = len(changed)
+
+    checks = 10000
+    def win_checks():
+        check_win = engine.check_win
+        for _ in range(checks):
+            check_win()
+
+    generate_time = best_of(generate, repeat)
+    win_time = best_of(win_checks, repeat)
+    return {
+        "size": f"{width}x{height}",
+        "density": density,
+        "generate_cells_per_s": cells / generate_time,
+        "cascade_cells": revealed,
+        "cascade_cells_per_s": revealed / cascade_time if revealed else 0.0,
+        "win_checks_per_s": checks / win_time,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """与基线比较，返回退化超过 tolerance 的条目描述"""
+    index = {(r["size"], r["density"]): r for r in baseline}
+    regressions = []
+    for result in results:
+        base = index.get((result["size"], result["density"]))
+        if base is None:
+            continue
+        for key in ("generate_cells_per_s", "cascade_cells_per_s", "win_checks_per_s"):
+            if base[key] and result[key] < base[key] * (1 - tolerance):
+                regressions.append(f"{result['size']} @ {result['density']:.0%} {key}: "
+                                   f"{result[key]:,.0f} < 基线 {base[key]:,.0f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫雷引擎性能基准")
+    parser.add_argument("--sizes", nargs="+", default=DEFAULT_SIZES, help="棋盘尺寸，如 100x60")
+    parser.add_argument("--densities", nargs="+", type=float, default=DEFAULT_DENSITIES, help="地雷比例，如 0.15")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数（取最快）")
+    parser.add_argument("--save", help="把结果保存为JSON基线")
+    parser.add_argument("--compare", help="与JSON基线比较，退化时返回非零退出码")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的相对退化比例")
+    args = parser.parse_args(argv)
+
+    print(f"{'尺寸':>10} {'密度':>6} {'布雷(格/秒)':>14} {'连锁格数':>10} {'连锁(格/秒)':>14} {'胜利判定(次/秒)':>16}")
+    results = []
+    for size in args.sizes:
+        width, height = parse_size(size)
+        for density in args.densities:
+            r = bench_config(width, height, density, args.repeat)
+            results.append(r)
+            print(f"{r['size']:>10} {density:>6.0%} {r['generate_cells_per_s']:>14,.0f} {r['cascade_cells']:>10,} "
+                  f"{r['cascade_cells_per_s']:>14,.0f} {r['win_checks_per_s']:>16,.0f}")
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("性能退化:")
+            for line in regressions:
+                print(f" - {line}")
+            return 1
+        print("未发现性能退化")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
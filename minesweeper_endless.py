@@ -0,0 +1,363 @@
+"""扫雷无尽模式（规则部分不依赖pygame）
+
+棋盘没有边界：格子是否是地雷由种子和坐标经哈希现算得到，周围雷数也按需计算，都不需要预先生成。
+只有玩家揭示或标记过的区域才会创建分块保存状态，内存随探索面积增长，而与棋盘名义大小无关。
+
+地雷较稀时空白区域可以无限连通，因此连锁只在关注区域（界面中为可见范围加一圈余量）内展开，
+并且每次最多揭示 CASCADE_LIMIT 格；区域外或超出上限的空白格按分块暂存，视口移到附近时再继续展开。
+
+用法:
+    python minesweeper_endless.py                      # 打开无尽模式窗口（需要pygame）
+    python minesweeper_endless.py --density 0.1 --seed 42
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from minesweeper_engine import NEIGHBOR_OFFSETS
+
+CHUNK_SIZE = 32  # 分块边长（格）
+CASCADE_LIMIT = 20000  # 单次连锁最多揭示的格子数，其余留到 continue_cascade 继续
+SAFE_RADIUS = 1  # 起点 (0, 0) 周围此范围内没有地雷
+VIEW_MARGIN = CHUNK_SIZE  # 关注区域在可见范围外多保留的格数
+DEFAULT_VIEW_RADIUS = 64  # 没有界面设置关注区域时，以 (0, 0) 为中心的关注范围
+
+_MASK64 = (1 << 64) - 1
+
+
+def cell_hash(seed, x, y):
+    """由种子和坐标得到均匀分布的64位哈希（splitmix64 混合），坐标可以为负"""
+    h = (seed * 0x9E3779B97F4A7C15 + x * 0xBF58476D1CE4E5B9 + y * 0x94D049BB133111EB) & _MASK64
+    h ^= h >> 30
+    h = (h * 0xBF58476D1CE4E5B9) & _MASK64
+    h ^= h >> 27
+    h = (h * 0x94D049BB133111EB) & _MASK64
+    return h ^ (h >> 31)
+
+
+class Chunk:
+    """一个 CHUNK_SIZE x CHUNK_SIZE 分块的揭示和标记状态"""
+    __slots__ = ("revealed", "flagged")
+
+    def __init__(self):
+        self.revealed = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+        self.flagged = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+
+
+class EndlessBoard:
+    """无边界棋盘：地雷和周围雷数按需计算，揭示和标记状态保存在稀疏分块中"""
+
+    def __init__(self, seed, density=0.15):
+        self.seed = seed
+        self.density = density
+        self.threshold = int(density * (1 << 64))
+        self.chunks = {}  # (分块x, 分块y) -> Chunk，只在写入时创建
+        self.revealed_count = 0
+        self.pending = {}  # (分块x, 分块y) -> 暂停展开的已揭示空白格 [(x, y)]（在关注区域外或超出上限）
+
+    # ---- 按需计算 ----
+    def is_mine(self, x, y):
+        if -SAFE_RADIUS <= x <= SAFE_RADIUS and -SAFE_RADIUS <= y <= SAFE_RADIUS:
+            return False
+        return cell_hash(self.seed, x, y) < self.threshold
+
+    def neighbor_mines(self, x, y):
+        is_mine = self.is_mine
+        return sum(1 for dx, dy in NEIGHBOR_OFFSETS if is_mine(x + dx, y + dy))
+
+    # ---- 稀疏状态 ----
+    @staticmethod
+    def _locate(x, y):
+        """返回 (分块坐标, 分块内下标)；负坐标按向下取整分块"""
+        cx, lx = divmod(x, CHUNK_SIZE)
+        cy, ly = divmod(y, CHUNK_SIZE)
+        return (cx, cy), ly * CHUNK_SIZE + lx
+
+    def _chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = Chunk()
+        return chunk
+
+    def is_revealed(self, x, y):
+        key, i = self._locate(x, y)
+        chunk = self.chunks.get(key)
+        return chunk is not None and chunk.revealed[i] == 1
+
+    def is_flagged(self, x, y):
+        key, i = self._locate(x, y)
+        chunk = self.chunks.get(key)
+        return chunk is not None and chunk.flagged[i] == 1
+
+    def toggle_flag(self, x, y):
+        """切换标记，已揭示的格子不能标记；返回是否改变"""
+        key, i = self._locate(x, y)
+        chunk = self._chunk(key)
+        if chunk.revealed[i]:
+            return False
+        chunk.flagged[i] ^= 1
+        return True
+
+    def cascade(self, seeds, limit=CASCADE_LIMIT, bounds=None):
+        """从一组起点 (x, y) 非递归地揭示，空白格连锁展开，返回新揭示的 (x, y) 列表
+
+        bounds 为关注区域 (x0, y0, x1, y1)（右下不含），区域外的空白格不展开；
+        揭示数达到 limit 时停止。没有展开的空白格暂存在 pending 中，由 continue_cascade 继续。
+        """
+        changed = []
+        stack = []
+        for x, y in seeds:
+            self._open(x, y, changed, stack)
+        self._expand(stack, changed, limit, bounds)
+        return changed
+
+    def continue_cascade(self, limit=CASCADE_LIMIT, bounds=None):
+        """继续展开关注区域内暂存的空白格，返回新揭示的 (x, y) 列表；只查看与区域相交的分块"""
+        stack = []
+        for key in self._pending_keys(bounds):
+            stack.extend(self.pending.pop(key))
+        changed = []
+        self._expand(stack, changed, limit, bounds)
+        return changed
+
+    def has_pending(self, bounds=None):
+        """关注区域内是否还有暂停展开的空白格"""
+        if bounds is None:
+            return bool(self.pending)
+        x0, y0, x1, y1 = bounds
+        return any(x0 <= x < x1 and y0 <= y < y1
+                   for key in self._pending_keys(bounds) for x, y in self.pending[key])
+
+    def _pending_keys(self, bounds):
+        """与关注区域相交且有暂存空白格的分块；分块数只取决于区域大小"""
+        if bounds is None:
+            return list(self.pending)
+        x0, y0, x1, y1 = bounds
+        pending = self.pending
+        return [(cx, cy)
+                for cy in range(y0 // CHUNK_SIZE, (y1 - 1) // CHUNK_SIZE + 1)
+                for cx in range(x0 // CHUNK_SIZE, (x1 - 1) // CHUNK_SIZE + 1)
+                if (cx, cy) in pending]
+
+    def _open(self, x, y, changed, stack):
+        key, i = self._locate(x, y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = Chunk()
+        if chunk.revealed[i] or chunk.flagged[i]:
+            return
+        chunk.revealed[i] = 1
+        changed.append((x, y))
+        self.revealed_count += 1
+        if not self.is_mine(x, y) and self.neighbor_mines(x, y) == 0:
+            stack.append((x, y))
+
+    def _expand(self, stack, changed, limit, bounds):
+        """展开 stack 中已揭示的空白格；区域外或超出上限的留在 pending 中"""
+        parked = []
+        while stack and len(changed) < limit:
+            x, y = stack.pop()
+            if bounds is not None and not (bounds[0] <= x < bounds[2] and bounds[1] <= y < bounds[3]):
+                parked.append((x, y))
+                continue
+            for dx, dy in NEIGHBOR_OFFSETS:
+                self._open(x + dx, y + dy, changed, stack)
+        parked.extend(stack)
+        pending = self.pending
+        for x, y in parked:
+            key = (x // CHUNK_SIZE, y // CHUNK_SIZE)
+            cells = pending.get(key)
+            if cells is None:
+                pending[key] = [(x, y)]
+            else:
+                cells.append((x, y))
+
+    def memory_cells(self):
+        """已分配状态的格子数（用于观察内存随探索面积的增长）"""
+        return len(self.chunks) * CHUNK_SIZE * CHUNK_SIZE
+
+
+class EndlessEngine:
+    """无尽模式规则引擎：没有胜利，揭示到地雷即结束；接口与 MinesweeperEngine 的揭示、标记部分一致"""
+
+    def __init__(self, mine_percentage=0.15, seed=None):
+        self.mine_percentage = mine_percentage
+        self.new_game(seed)
+
+    def new_game(self, seed=None):
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.board = EndlessBoard(seed, self.mine_percentage)
+        self.score = 0
+        self.game_over = False
+        self.start_time = time.time()
+        r = DEFAULT_VIEW_RADIUS
+        self.bounds = (-r, -r, r + 1, r + 1)
+
+    def set_view(self, x0, y0, x1, y1, margin=VIEW_MARGIN):
+        """设置可见范围 [x0, x1) x [y0, y1)；连锁只在其外扩 margin 格的区域内展开"""
+        self.bounds = (x0 - margin, y0 - margin, x1 + margin, y1 + margin)
+
+    def on_event(self, name, cells=None):
+        """规则事件回调（reveal/lose/flag），cells 为状态改变的单元格；默认不做任何事"""
+        pass
+
+    def reveal(self, x, y, fast_reveal=False):
+        """揭示单元格，返回本次改变的单元格集合；从 (0, 0) 附近开始总是安全的"""
+        board = self.board
+        if self.game_over or board.is_revealed(x, y) or board.is_flagged(x, y):
+            return set()
+        return self._reveal_cascade([(x, y)], fast_reveal)
+
+    def _reveal_cascade(self, seeds, fast_reveal=False):
+        changed = self.board.cascade(seeds, bounds=self.bounds)
+        return self._settle(changed, fast_reveal)
+
+    def _settle(self, changed, fast_reveal=False):
+        if not changed:
+            return set()
+        cells = set(changed)
+        self.on_event("reveal", cells)
+        safe_count = sum(1 for x, y in changed if not self.board.is_mine(x, y))
+        if safe_count < len(changed):
+            self.game_over = True
+            self.on_event("lose")
+        self.score += (5 if not fast_reveal else 1) * safe_count
+        return cells
+
+    def continue_cascade(self, limit=CASCADE_LIMIT):
+        """继续关注区域内暂停的连锁（界面层在视口移动后或每帧调用），返回本次改变的单元格集合"""
+        if self.game_over:
+            return set()
+        return self._settle(self.board.continue_cascade(limit, self.bounds))
+
+    def has_pending(self):
+        return not self.game_over and self.board.has_pending(self.bounds)
+
+    def reveal_around(self, x, y):
+        """根据标记数量揭示周围单元格，返回本次改变的单元格集合"""
+        board = self.board
+        if self.game_over or not board.is_revealed(x, y) or board.is_mine(x, y):
+            return set()
+        count = board.neighbor_mines(x, y)
+        neighbors = [(x + dx, y + dy) for dx, dy in NEIGHBOR_OFFSETS]
+        if count and sum(board.is_flagged(nx, ny) for nx, ny in neighbors) == count:
+            return self._reveal_cascade(neighbors, fast_reveal=True)
+        return set()
+
+    def toggle_flag(self, x, y):
+        """切换旗帜标记，返回本次改变的单元格集合"""
+        if self.game_over or not self.board.toggle_flag(x, y):
+            return set()
+        self.on_event("flag", {(x, y)})
+        return {(x, y)}
+
+
+FRAME_CASCADE_LIMIT = 2000  # 界面中每帧最多继续揭示的格子数，保证滚动时不卡顿
+HEADER_HEIGHT = 40
+
+
+def play(density=0.15, seed=None, cell_size=25, size=(960, 720)):
+    """在窗口中玩无尽模式（需要pygame），返回结束时的引擎
+
+    左键揭示（点已揭示的数字等同中键），右键标记，中键按旗数揭示周围；方向键或滚轮滚动，R 重新开始，Esc 退出。
+    """
+    import pygame
+    import 扫雷 as ui
+
+    pygame.init()
+    screen = pygame.display.set_mode(size, pygame.RESIZABLE)
+    pygame.display.set_caption("扫雷无尽模式")
+    font = ui.create_font(18)
+    atlas = ui.TileAtlas(cell_size, font, None)
+    engine = EndlessEngine(density, seed)
+    # 视口左上角对应的像素坐标，起点 (0, 0) 放在窗口中央
+    offset = [cell_size // 2 - size[0] // 2, cell_size // 2 - (size[1] - HEADER_HEIGHT) // 2]
+
+    def visible():
+        width, height = screen.get_size()
+        return (offset[0] // cell_size, offset[1] // cell_size,
+                (offset[0] + width) // cell_size + 1, (offset[1] + height - HEADER_HEIGHT) // cell_size + 1)
+
+    def tile(x, y):
+        board = engine.board
+        if board.is_revealed(x, y):
+            return ui.TILE_MINE if board.is_mine(x, y) else board.neighbor_mines(x, y)
+        return ui.TILE_FLAGGED if board.is_flagged(x, y) else ui.TILE_HIDDEN
+
+    def draw():
+        screen.fill(ui.REVEALED)
+        x0, y0, x1, y1 = visible()
+        tiles = atlas.tiles
+        for y in range(y0, y1):
+            py = HEADER_HEIGHT + y * cell_size - offset[1]
+            for x in range(x0, x1):
+                screen.blit(tiles[tile(x, y)], (x * cell_size - offset[0], py))
+        pygame.draw.rect(screen, ui.SIDEBAR_COLOR, (0, 0, screen.get_width(), HEADER_HEIGHT))
+        status = "踩到地雷！按 R 重新开始" if engine.game_over else f"已揭示 {engine.board.revealed_count} 格"
+        text = font.render(f"积分: {engine.score}  种子: {engine.seed}  {status}", True, ui.TEXT_COLOR)
+        screen.blit(text, (10, HEADER_HEIGHT // 2 - text.get_height() // 2))
+        pygame.display.flip()
+
+    def scroll(dx, dy):
+        offset[0] += dx * ui.SCROLL_CELLS * cell_size
+        offset[1] += dy * ui.SCROLL_CELLS * cell_size
+
+    dirty = True
+    while True:
+        engine.set_view(*visible())
+        if engine.has_pending() and engine.continue_cascade(FRAME_CASCADE_LIMIT):
+            dirty = True
+        if dirty:
+            draw()
+            dirty = False
+        # 还有可继续的连锁时不阻塞，否则一直睡到下一个输入
+        events = pygame.event.get() if engine.has_pending() else [pygame.event.wait()] + pygame.event.get()
+        for event in events:
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return engine
+            if event.type == pygame.VIDEORESIZE:
+                screen = pygame.display.set_mode(event.size, pygame.RESIZABLE)
+            elif event.type == pygame.MOUSEWHEEL:
+                scroll(-event.x, -event.y)
+            elif event.type == pygame.KEYDOWN:
+                if event.key in (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN):
+                    scroll((event.key == pygame.K_RIGHT) - (event.key == pygame.K_LEFT),
+                           (event.key == pygame.K_DOWN) - (event.key == pygame.K_UP))
+                elif event.key == pygame.K_r:
+                    engine.new_game()
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 2, 3):
+                px, py = event.pos
+                if py < HEADER_HEIGHT:
+                    continue
+                x = (px + offset[0]) // cell_size
+                y = (py - HEADER_HEIGHT + offset[1]) // cell_size
+                engine.set_view(*visible())
+                if event.button == 3:
+                    engine.toggle_flag(x, y)
+                elif event.button == 2 or engine.board.is_revealed(x, y):
+                    engine.reveal_around(x, y)
+                else:
+                    engine.reveal(x, y)
+            dirty = True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫雷无尽模式")
+    parser.add_argument("--density", type=float, default=0.15, help="地雷比例（0.01-0.3）")
+    parser.add_argument("--seed", type=int, help="地图种子（默认随机）")
+    parser.add_argument("--cell-size", type=int, default=25, help="单元格大小（像素）")
+    args = parser.parse_args(argv)
+    if not 0.01 <= args.density <= 0.3:
+        parser.error("地雷比例需在 0.01 到 0.3 之间")
+    engine = play(args.density, args.seed, args.cell_size)
+    print(f"种子 {engine.seed}，积分 {engine.score}，已揭示 {engine.board.revealed_count} 格")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
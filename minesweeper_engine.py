@@ -0,0 +1,581 @@
+"""扫雷棋盘引擎（不依赖pygame，可选使用NumPy加速）"""
+
+import random
+import time
+from array import array
+
+from minesweeper_history import DEFAULT_HISTORY_LIMIT, History, Step
+from minesweeper_solver import Solver
+
+try:
+    import numpy as np
+except ImportError:  # NumPy为可选依赖，缺失时退回纯Python实现
+    np = None
+
+# 八邻域偏移
+NEIGHBOR_OFFSETS = [(-1, -1), (0, -1), (1, -1),
+                    (-1, 0),           (1, 0),
+                    (-1, 1),  (0, 1),  (1, 1)]
+
+ZERO_FILL_MIN = 4096  # 连锁揭示超过这么多格且有NumPy时，改用 _zero_fill 完成
+SEED_MASK = (1 << 64) - 1  # 存档和录像按64位无符号整数保存种子
+
+
+def config_key(width, height, density, tool_size):
+    """对局配置的标识（自对弈结果和结果库按它分组）"""
+    return f"{width}x{height}@{density:g}/tool{tool_size}"
+
+
+def normalize_seed(seed):
+    """把外部传入的种子截断为64位无符号整数，保证任何种子都能写入存档和录像；None 保持不变"""
+    return None if seed is None else int(seed) & SEED_MASK
+
+
+class Board:
+    """数组化棋盘：地雷、揭示、标记、提示、周围雷数和周围旗数各占一个紧凑的字节平面
+
+    单元格 (x, y) 在各平面中的下标为 y * width + x。
+    平面使用 bytearray 存储（每格1字节），有NumPy时通过零拷贝视图做向量化计算。
+    safe_remaining 实时记录尚未揭示的安全格数量，胜利判定只需检查它是否为0。
+    flag_counts 由 set_flag 增量维护，双击揭示的判定和"数字已满足"的显示都只需查表。
+    """
+
+    def __init__(self, width, height, use_numpy=None):
+        self.width = width
+        self.height = height
+        self.size = width * height
+        self.use_numpy = (np is not None) if use_numpy is None else (use_numpy and np is not None)
+        self.mines = bytearray(self.size)
+        self.revealed = bytearray(self.size)
+        self.flagged = bytearray(self.size)
+        self.hinted = bytearray(self.size)
+        self.counts = bytearray(self.size)
+        self.flag_counts = bytearray(self.size)
+        self.safe_remaining = self.size
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('use_numpy', None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.use_numpy = np is not None
+        if 'hinted' not in state:
+            self.hinted = bytearray(self.size)
+        if 'flag_counts' not in state:
+            self.flag_counts = bytearray(self.size)
+        self.recount()
+
+    # ---- 坐标工具 ----
+    def in_bounds(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def neighbors(self, x, y):
+        """返回 (x, y) 在棋盘范围内的八个邻居坐标"""
+        width, height = self.width, self.height
+        return [(x + dx, y + dy) for dx, dy in NEIGHBOR_OFFSETS
+                if 0 <= x + dx < width and 0 <= y + dy < height]
+
+    def area(self, x, y, radius=1):
+        """返回以 (x, y) 为中心、半径为 radius 的方形区域（含中心，已裁剪到棋盘内）"""
+        return [(nx, ny)
+                for ny in range(max(0, y - radius), min(self.height, y + radius + 1))
+                for nx in range(max(0, x - radius), min(self.width, x + radius + 1))]
+
+    # ---- 单元格状态 ----
+    def is_mine(self, x, y):
+        return self.mines[y * self.width + x] == 1
+
+    def is_revealed(self, x, y):
+        return self.revealed[y * self.width + x] == 1
+
+    def is_flagged(self, x, y):
+        return self.flagged[y * self.width + x] == 1
+
+    def neighbor_mines(self, x, y):
+        return self.counts[y * self.width + x]
+
+    def neighbor_flags(self, x, y):
+        return self.flag_counts[y * self.width + x]
+
+    def is_satisfied(self, i):
+        """已揭示的数字格周围的旗数是否恰好等于其数字"""
+        count = self.counts[i]
+        return count != 0 and self.revealed[i] and not self.mines[i] and self.flag_counts[i] == count
+
+    def set_flag(self, i, value):
+        """设置标记并同步更新八个邻居的周围旗数，返回是否改变"""
+        if self.flagged[i] == value:
+            return False
+        self.flagged[i] = value
+        width, height = self.width, self.height
+        flag_counts = self.flag_counts
+        y, x = divmod(i, width)
+        for dx, dy in NEIGHBOR_OFFSETS:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < width and 0 <= ny < height:
+                if value:
+                    flag_counts[ny * width + nx] += 1
+                else:
+                    flag_counts[ny * width + nx] -= 1
+        return True
+
+    # ---- 地雷与周围雷数 ----
+    def set_mines(self, indices):
+        """按下标放置地雷，并一次性重新计算所有周围雷数"""
+        mines = self.mines
+        for i in indices:
+            mines[i] = 1
+        self.compute_neighbor_counts()
+        self.recount()
+
+    def place_random_mines(self, count, excluded, seed):
+        """在 excluded 下标以外的格子中无放回抽样放置 count 个地雷，返回实际放置数
+
+        直接在合格格子的编号空间上抽样，不做拒绝重试，耗时与地雷密度无关；
+        相同的 seed 与 excluded 总是生成相同的棋盘。
+        """
+        excluded = sorted(set(excluded))
+        eligible = self.size - len(excluded)
+        count = max(0, min(count, eligible))
+        indices = []
+        for rank in random.Random(seed).sample(range(eligible), count):
+            # 把合格格子中的序号映射回棋盘下标（跳过排除的格子）
+            for e in excluded:
+                if e > rank:
+                    break
+                rank += 1
+            indices.append(rank)
+        self.set_mines(indices)
+        return count
+
+    def recount(self):
+        """全量重新统计未揭示的安全格数量和周围旗数（仅在布雷和读档时调用）"""
+        self._neighbor_sums(self.flagged, self.flag_counts)
+        if self.use_numpy:
+            mines = np.frombuffer(self.mines, dtype=np.uint8)
+            revealed = np.frombuffer(self.revealed, dtype=np.uint8)
+            self.safe_remaining = int(np.count_nonzero((mines | revealed) == 0))
+        else:
+            mines, revealed = self.mines, self.revealed
+            self.safe_remaining = sum(1 for i in range(self.size) if not mines[i] and not revealed[i])
+
+    def compute_neighbor_counts(self):
+        """根据地雷平面计算每格的周围雷数（有NumPy时为一次向量化运算）"""
+        self._neighbor_sums(self.mines, self.counts)
+
+    def _neighbor_sums(self, plane, out):
+        """把 0/1 平面 plane 中每格八邻域之和写入 out"""
+        width, height = self.width, self.height
+        if self.use_numpy:
+            values = np.frombuffer(plane, dtype=np.uint8).reshape(height, width)
+            padded = np.zeros((height + 2, width + 2), dtype=np.uint8)
+            padded[1:-1, 1:-1] = values
+            counts = np.zeros((height, width), dtype=np.uint8)
+            for dx, dy in NEIGHBOR_OFFSETS:
+                counts += padded[1 + dy:1 + dy + height, 1 + dx:1 + dx + width]
+            np.frombuffer(out, dtype=np.uint8)[:] = counts.ravel()
+            return
+        counts = bytearray(self.size)
+        for i in range(self.size):
+            if plane[i]:
+                y, x = divmod(i, width)
+                for nx, ny in self.neighbors(x, y):
+                    counts[ny * width + nx] += 1
+        out[:] = counts
+
+    # ---- 揭示 ----
+    def cascade(self, seeds):
+        """从一组起点下标出发非递归地揭示单元格，空白格（周围雷数为0）连锁展开
+
+        已揭示或已标记的格子会被跳过，safe_remaining 随之递减。
+        返回 (本次新揭示的下标 array('I'), 其中的安全格数)；只有起点本身可能是地雷。
+        连锁超过 ZERO_FILL_MIN 格且有NumPy时撤回已揭示的部分，改由 _zero_fill 一次完成。
+        """
+        width, height = self.width, self.height
+        mines, revealed, flagged, counts = self.mines, self.revealed, self.flagged, self.counts
+        seeds = list(seeds)
+        changed = []
+        stack = []
+        mine_count = 0
+        for i in seeds:
+            if revealed[i] or flagged[i]:
+                continue
+            revealed[i] = 1
+            changed.append(i)
+            if mines[i]:
+                mine_count += 1
+            elif counts[i] == 0:
+                stack.append(i)
+        zero_fill = self.use_numpy
+        while stack:
+            if zero_fill and len(changed) > ZERO_FILL_MIN:
+                for i in changed:
+                    revealed[i] = 0
+                return self._zero_fill(seeds)
+            i = stack.pop()
+            y, x = divmod(i, width)
+            for dx, dy in NEIGHBOR_OFFSETS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < width and 0 <= ny < height:
+                    j = ny * width + nx
+                    if revealed[j] or flagged[j]:
+                        continue
+                    revealed[j] = 1
+                    changed.append(j)
+                    if counts[j] == 0:  # 空白格的邻居不可能是地雷
+                        stack.append(j)
+        safe_count = len(changed) - mine_count
+        self.safe_remaining -= safe_count
+        return array('I', changed), safe_count
+
+    def _zero_fill(self, seeds):
+        """cascade 的NumPy实现：只在 Python 中遍历连通的空白格，其八邻域（边界上的数字格）由一次向量化膨胀求出
+
+        在四周各加一格的平面上遍历，邻居下标只需加固定偏移，不必做坐标换算和越界判断。
+        """
+        width, height = self.width, self.height
+        padded_width = width + 2
+        revealed = np.frombuffer(self.revealed, dtype=np.uint8)
+        mines = np.frombuffer(self.mines, dtype=np.uint8)
+        blocked = revealed | np.frombuffer(self.flagged, dtype=np.uint8)
+        open_zero = np.zeros((height + 2, padded_width), dtype=np.uint8)
+        open_zero[1:-1, 1:-1] = ((np.frombuffer(self.counts, dtype=np.uint8) == 0) & (mines == 0)
+                                 & (blocked == 0)).reshape(height, width)
+        open_zero = bytearray(open_zero)
+        new = np.zeros(self.size, dtype=bool)
+        stack = []
+        for i in seeds:
+            if blocked[i]:
+                continue
+            new[i] = True
+            y, x = divmod(i, width)
+            p = (y + 1) * padded_width + x + 1
+            if open_zero[p]:
+                open_zero[p] = 0
+                stack.append(p)
+        zero = list(stack)
+        offsets = [dy * padded_width + dx for dx, dy in NEIGHBOR_OFFSETS]
+        push, pop, add = stack.append, stack.pop, zero.append
+        while stack:
+            p = pop()
+            for offset in offsets:
+                q = p + offset
+                if open_zero[q]:
+                    open_zero[q] = 0
+                    push(q)
+                    add(q)
+        area = np.zeros((height + 2) * padded_width, dtype=bool)
+        area[zero] = True
+        area = area.reshape(height + 2, padded_width)
+        rows = area[:, :-2] | area[:, 1:-1] | area[:, 2:]
+        new |= (rows[:-2] | rows[1:-1] | rows[2:]).ravel()
+        new &= blocked == 0
+        changed = np.flatnonzero(new).astype(np.uint32)
+        revealed[changed] = 1
+        safe_count = len(changed) - int(np.count_nonzero(mines[changed]))
+        self.safe_remaining -= safe_count
+        return array('I', changed.tobytes()), safe_count
+
+    def flip_revealed(self, indices):
+        """翻转一组格子（array('I')，各不相同）的揭示状态并清除其提示，同步更新 safe_remaining（撤销/重做使用）"""
+        revealed, hinted, mines = self.revealed, self.hinted, self.mines
+        if self.use_numpy:
+            indices = np.frombuffer(indices, dtype=np.uint32)
+            revealed = np.frombuffer(revealed, dtype=np.uint8)
+            revealed[indices] ^= 1
+            np.frombuffer(hinted, dtype=np.uint8)[indices] = 0
+            safe = np.frombuffer(mines, dtype=np.uint8)[indices] == 0
+            now_revealed = int(np.count_nonzero(safe & (revealed[indices] == 1)))
+            self.safe_remaining += int(np.count_nonzero(safe)) - 2 * now_revealed
+            return
+        for i in indices:
+            revealed[i] ^= 1
+            hinted[i] = 0
+            if not mines[i]:
+                self.safe_remaining += -1 if revealed[i] else 1
+
+    def is_cleared(self):
+        """所有安全格是否均已揭示（O(1)）"""
+        return self.safe_remaining == 0
+
+    def mine_count(self):
+        return self.mines.count(1)
+
+    @classmethod
+    def from_cells(cls, cells):
+        """从旧版 Cell 对象二维列表构建棋盘（用于读取旧存档）"""
+        height = len(cells)
+        width = len(cells[0]) if height else 0
+        board = cls(width, height)
+        for y, row in enumerate(cells):
+            for x, cell in enumerate(row):
+                i = y * width + x
+                board.mines[i] = 1 if cell.is_mine else 0
+                board.revealed[i] = 1 if cell.is_revealed else 0
+                board.flagged[i] = 1 if cell.is_flagged else 0
+                board.hinted[i] = 1 if getattr(cell, 'is_hinted', False) else 0
+        board.compute_neighbor_counts()
+        board.recount()
+        return board
+
+
+class MinesweeperEngine:
+    """扫雷规则引擎：棋盘、布雷、揭示、标记、道具和胜负判定，不依赖pygame
+
+    界面层（扫雷.py 中的 Minesweeper）继承此类，并通过重写 on_event 播放音效、刷新画面。
+    各操作返回、on_event 收到的都是状态改变的格子下标（y * width + x），大范围连锁时不必逐格换算坐标。
+    不需要提示的子类可以把 solver_class 换成更轻量的实现，省去每一步的增量推理。
+    """
+    solver_class = Solver
+
+    def __init__(self, width=30, height=20, mine_percentage=0.15, tool_size=3, seed=None,
+                 history_limit=DEFAULT_HISTORY_LIMIT):
+        self.width = width
+        self.height = height
+        self.mine_percentage = mine_percentage
+        self.tool_size = tool_size
+        self.tool_cost = 1000  # 道具成本固定为1000分
+        self.total_score = 0  # 总积分（界面层从积分文件读取）
+        self.history_limit = history_limit
+        self.new_game(seed)
+
+    def new_game(self, seed=None):
+        """按当前尺寸和地雷比例开始新的一局"""
+        self.board = Board(self.width, self.height)
+        self.total_mines = int(self.width * self.height * self.mine_percentage)
+        self.score = 0  # 单局积分
+        self.game_over = False
+        self.win = False
+        self.first_click = True
+        self.seed = normalize_seed(seed)  # 布雷种子（None 表示首次点击时随机生成）
+        self.first_click_pos = None
+        self.start_time = time.time()
+        self.game_time = 0
+        self.solver = self.solver_class(self.board, self.total_mines)
+        self.history = History(self.history_limit)
+
+    def set_board(self, board):
+        """替换整个棋盘（读档时使用），并据此重建求解器；撤销历史不跨越读档"""
+        self.board = board
+        self.width = board.width
+        self.height = board.height
+        if board.mine_count():
+            self.total_mines = board.mine_count()
+        self.solver = self.solver_class(board, self.total_mines)
+        self.solver.sync()
+        self.history.clear()
+
+    def on_event(self, name, cells=None):
+        """规则事件回调（reveal/lose/flag/tool/hint/undo/redo），cells 为状态改变的格子下标；默认不做任何事"""
+        pass
+
+    def place_mines(self, first_x, first_y, seed=None):
+        """放置地雷（避开首次点击区域）；相同的种子和首次点击位置总是生成相同的棋盘"""
+        board = self.board
+        seed = self.seed if seed is None else normalize_seed(seed)
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.first_click_pos = (first_x, first_y)
+        safe_zone = [board.index(nx, ny) for nx, ny in board.area(first_x, first_y)]
+        self.total_mines = board.place_random_mines(int(self.width * self.height * self.mine_percentage), safe_zone, seed)
+        self.solver.total_mines = self.total_mines
+
+    def reveal(self, x, y, fast_reveal=False):
+        """揭示单元格（空白区域一次性连锁展开），返回本次改变的格子下标"""
+        board = self.board
+        if not board.in_bounds(x, y):
+            return ()
+        i = board.index(x, y)
+        if board.revealed[i] or board.flagged[i] or self.win:
+            return ()
+        before = self._state()
+        placed_mines = self.first_click
+        if self.first_click:
+            self.place_mines(x, y)
+            self.first_click = False
+            self.start_time = time.time()
+        cells = self._reveal_cascade([i], fast_reveal)
+        self._push_step(before, cells, (), placed_mines)
+        return cells
+
+    def _reveal_cascade(self, seeds, fast_reveal=False):
+        """批量揭示一组起点及其连锁区域，积分与音效每次连锁只结算一次"""
+        changed, safe_count = self.board.cascade(seeds)
+        if not changed:
+            return ()
+        self.solver.update(changed)
+        self.on_event("reveal", changed)
+        if safe_count < len(changed):
+            self.game_over = True
+            self.on_event("lose")
+        if not self.win:
+            self.score += (5 if not fast_reveal else 1) * safe_count
+        return changed
+
+    def reveal_around(self, x, y):
+        """根据标记数量揭示周围单元格，返回本次改变的格子下标"""
+        board = self.board
+        if not board.in_bounds(x, y):
+            return ()
+        i = board.index(x, y)
+        # 周围旗数由 set_flag 增量维护，判定无需扫描邻域
+        if not board.is_satisfied(i):
+            return ()
+        before = self._state()
+        cells = self._reveal_cascade([board.index(nx, ny) for nx, ny in board.neighbors(x, y)], fast_reveal=True)
+        self._push_step(before, cells, ())
+        return cells
+
+    def toggle_flag(self, x, y):
+        """切换旗帜标记，返回本次改变的格子下标"""
+        board = self.board
+        if not board.in_bounds(x, y):
+            return ()
+        i = board.index(x, y)
+        if board.revealed[i]:
+            return ()
+        before = self._state()
+        board.set_flag(i, 0 if board.flagged[i] else 1)
+        self._push_step(before, (), (i,))
+        self.on_event("flag", (i,))
+        return (i,)
+
+    def use_tool(self, x, y):
+        """使用扫雷道具（优先扣除单局积分，不足时扣除总积分），积分不足时返回 False"""
+        cost = self.tool_cost
+        before = self._state()
+        if self.score >= cost:
+            self.score -= cost
+        elif self.total_score >= cost - self.score:
+            self.total_score -= cost - self.score
+            self.score = 0
+        else:
+            return False
+        cells = self._apply_tool(x, y)
+        self._push_step(before, (), cells)
+        return True
+
+    def _apply_tool(self, x, y):
+        """应用道具效果：标记 tool_size 范围内的所有地雷，返回本次改变的格子下标"""
+        start_x = max(0, x - self.tool_size // 2)
+        end_x = min(self.width, x + self.tool_size // 2 + 1)
+        start_y = max(0, y - self.tool_size // 2)
+        end_y = min(self.height, y + self.tool_size // 2 + 1)
+        board = self.board
+        cells = []
+        found = []
+        clear = []
+        for y_idx in range(start_y, end_y):
+            for x_idx in range(start_x, end_x):
+                i = board.index(x_idx, y_idx)
+                if board.mines[i]:
+                    found.append((x_idx, y_idx))
+                    if board.set_flag(i, 1):
+                        cells.append(i)
+                else:
+                    clear.append((x_idx, y_idx))
+        # 道具标出的一定是地雷，范围内其余格子一定安全
+        self.solver.add_mines(found)
+        self.solver.add_safe(clear)
+        self.on_event("tool", cells)
+        return cells
+
+    def hint(self, budget=None):
+        """标记提示格：所有确定安全的未揭示格；没有时标记地雷概率最低的一格
+
+        budget 为求解器本次可用的时间（秒）。清除上一次的提示，返回提示状态改变的格子下标集合。
+        """
+        board = self.board
+        if self.first_click:
+            targets = [(self.width // 2, self.height // 2)]  # 首次点击总是安全的
+        else:
+            self.solver.step(budget)
+            targets = self.solver.certain_safe()
+            if not targets:
+                guess = self.solver.best_guess()
+                targets = [guess] if guess is not None else []
+        hinted = board.hinted
+        old = set()
+        i = hinted.find(1)
+        while i != -1:
+            old.add(i)
+            i = hinted.find(1, i + 1)
+        new = {board.index(x, y) for x, y in targets}
+        for i in old - new:
+            hinted[i] = 0
+        for i in new - old:
+            hinted[i] = 1
+        changed = old ^ new
+        self.on_event("hint", changed)
+        return changed
+
+    # ---- 撤销/重做 ----
+    def _state(self):
+        """撤销时需要恢复的标量状态
+
+        不包含种子：种子一经确定就保留，撤销首次点击后重新布雷仍使用同一个种子，录像才能如实重现。
+        """
+        return (self.score, self.total_score, self.game_over, self.win, self.first_click,
+                self.first_click_pos, self.total_mines)
+
+    def _set_state(self, state):
+        (self.score, self.total_score, self.game_over, self.win, self.first_click,
+         self.first_click_pos, self.total_mines) = state
+
+    def _push_step(self, before, revealed, flagged, placed_mines=False):
+        self.history.push(Step(revealed, flagged, before, self._state(), placed_mines))
+
+    def undo(self):
+        """撤销上一步操作，返回改变的格子下标；没有可撤销的步骤时返回空序列"""
+        step = self.history.pop_undo()
+        if step is None:
+            return ()
+        return self._apply_step(step, forward=False)
+
+    def redo(self):
+        """重做上一次撤销的操作，返回改变的格子下标"""
+        step = self.history.pop_redo()
+        if step is None:
+            return ()
+        return self._apply_step(step, forward=True)
+
+    def _apply_step(self, step, forward):
+        """把一步的差异再翻转一次（撤销与重做都是翻转），并恢复对应的标量状态"""
+        board = self.board
+        if forward and step.placed_mines:
+            # 重做首次点击：相同的种子和首次点击位置生成相同的棋盘
+            first_x, first_y = step.after[5]
+            self.place_mines(first_x, first_y)
+        for i in step.flagged:
+            board.set_flag(i, board.flagged[i] ^ 1)
+            board.hinted[i] = 0
+        board.flip_revealed(step.revealed)
+        if not forward and step.placed_mines:
+            # 撤销首次点击：清空地雷，下次点击时重新布雷
+            board.mines[:] = bytes(board.size)
+            board.counts[:] = bytes(board.size)
+            board.recount()
+        self._set_state(step.after if forward else step.before)
+        # 求解器只依据已揭示的格子推理（玩家的旗子不影响推理）：重做揭示时增量登记，
+        # 撤销揭示时已有的推理可能用到了不再可见的信息，标记为过期，下次提示时才重建
+        if step.placed_mines:
+            self.solver = self.solver_class(board, self.total_mines)
+            self.solver.sync()
+        elif step.revealed:
+            if forward:
+                self.solver.update(step.revealed)
+            else:
+                self.solver.sync()
+        cells = step.revealed + step.flagged
+        self.on_event("redo" if forward else "undo", cells)
+        return cells
+
+    def check_win(self):
+        """检查是否胜利（由棋盘实时维护的未揭示安全格计数判断，O(1)）"""
+        return self.board.is_cleared()
@@ -0,0 +1,73 @@
+"""扫雷撤销/重做历史（不依赖pygame）
+
+每一步只保存这一步中揭示状态或标记状态翻转过的格子下标，以及积分、胜负等少量标量，
+内存与本步涉及的格子数成正比，与棋盘大小无关；撤销和重做只需把这些格子再翻转一次。
+"""
+
+from array import array
+from collections import deque
+
+DEFAULT_HISTORY_LIMIT = 500  # 默认最多可撤销的步数
+
+
+class Step:
+    """一步操作的差异
+
+    revealed / flagged 为揭示、标记状态翻转过的格子下标；before / after 为操作前后的标量状态；
+    placed_mines 表示这一步是首次点击（撤销时要清空地雷，重做时按相同种子重新布雷）。
+    """
+    __slots__ = ("revealed", "flagged", "before", "after", "placed_mines")
+
+    def __init__(self, revealed, flagged, before, after, placed_mines=False):
+        self.revealed = array('I', revealed)
+        self.flagged = array('I', flagged)
+        self.before = before
+        self.after = after
+        self.placed_mines = placed_mines
+
+    def cell_count(self):
+        return len(self.revealed) + len(self.flagged)
+
+
+class History:
+    """有上限的撤销栈和重做栈；超过上限时丢弃最早的步骤"""
+
+    def __init__(self, limit=DEFAULT_HISTORY_LIMIT):
+        self.limit = limit
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+
+    def push(self, step):
+        """记录新的一步；新操作会使之前撤销的步骤无法再重做"""
+        if self.limit <= 0:
+            return
+        self.undo_stack.append(step)
+        self.redo_stack.clear()
+
+    def pop_undo(self):
+        if not self.undo_stack:
+            return None
+        step = self.undo_stack.pop()
+        self.redo_stack.append(step)
+        return step
+
+    def pop_redo(self):
+        if not self.redo_stack:
+            return None
+        step = self.redo_stack.pop()
+        self.undo_stack.append(step)
+        return step
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+
+    def cell_count(self):
+        """历史中保存的格子下标总数（用于观察内存占用）"""
+        return sum(step.cell_count() for step in self.undo_stack) + sum(step.cell_count() for step in self.redo_stack)
@@ -0,0 +1,126 @@
+"""扫雷服务器压测客户端：模拟大量同时在线的玩家，测量每秒步数和应答延迟分位数（不依赖pygame）
+
+每个模拟玩家占用一个连接，同一时刻只有一个未完成的请求：随机揭示或标记尚未揭示的格子，
+一局结束后立即开始新的一局。客户端只根据应答中的差异维护自己的未揭示格集合。
+
+用法:
+    python minesweeper_server.py --port 8765 &
+    python minesweeper_loadgen.py --port 8765 --clients 2000 --duration 10 --size 30x20
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from minesweeper_server import CELL_FLAGGED, CELL_HIDDEN, DEFAULT_HOST, DEFAULT_PORT
+
+FLAG_PROBABILITY = 0.1  # 每步标记而不是揭示的概率
+CONNECT_CONCURRENCY = 200  # 同时进行中的连接握手数，避免瞬间占满服务器的监听队列
+
+
+class LoadStats:
+    """所有模拟玩家共享的统计"""
+
+    def __init__(self):
+        self.latencies = []
+        self.games = 0
+        self.errors = 0
+        self.reply_bytes = 0
+
+    def percentile(self, p):
+        values = self.latencies
+        return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+async def player(host, port, width, height, density, seed, deadline, stats, connect_limit):
+    """一个模拟玩家：循环对局直到 deadline"""
+    rng = random.Random(seed)
+    async with connect_limit:
+        reader, writer = await asyncio.open_connection(host, port)
+    next_id = 0
+
+    async def request(message):
+        nonlocal next_id
+        next_id += 1
+        message["id"] = next_id
+        start = time.perf_counter()
+        writer.write(json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n")
+        line = await reader.readline()
+        stats.latencies.append(time.perf_counter() - start)
+        stats.reply_bytes += len(line)
+        reply = json.loads(line)
+        if "error" in reply:
+            stats.errors += 1
+        return reply
+
+    try:
+        while time.perf_counter() < deadline:
+            await request({"op": "new", "width": width, "height": height, "density": density,
+                           "seed": rng.getrandbits(32)})
+            hidden = list(range(width * height))
+            positions = {i: i for i in hidden}  # 下标 -> 在 hidden 中的位置，便于 O(1) 删除
+            state = "playing"
+            while state == "playing" and hidden and time.perf_counter() < deadline:
+                i = hidden[rng.randrange(len(hidden))]
+                op = "flag" if rng.random() < FLAG_PROBABILITY else "reveal"
+                reply = await request({"op": op, "x": i % width, "y": i // width})
+                state = reply.get("state", state)
+                cells = reply.get("cells", ())
+                for k in range(0, len(cells), 2):
+                    cell, value = cells[k], cells[k + 1]
+                    if value != CELL_HIDDEN and value != CELL_FLAGGED and cell in positions:
+                        # 与末尾元素交换后删除
+                        pos = positions.pop(cell)
+                        last = hidden.pop()
+                        if last != cell:
+                            hidden[pos] = last
+                            positions[last] = pos
+            stats.games += 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, clients, duration, width, height, density):
+    stats = LoadStats()
+    deadline = time.perf_counter() + duration
+    connect_limit = asyncio.Semaphore(CONNECT_CONCURRENCY)
+    tasks = [asyncio.create_task(player(host, port, width, height, density, n, deadline, stats, connect_limit))
+             for n in range(clients)]
+    start = time.perf_counter()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    failures = [r for r in results if isinstance(r, Exception)]
+    return stats, elapsed, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫雷服务器压测客户端")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--clients", type=int, default=1000, help="同时在线的模拟玩家数")
+    parser.add_argument("--duration", type=float, default=10.0, help="压测时长（秒）")
+    parser.add_argument("--size", default="30x20", help="棋盘尺寸，如 30x20")
+    parser.add_argument("--density", type=float, default=0.15, help="地雷比例")
+    args = parser.parse_args(argv)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+
+    stats, elapsed, failures = asyncio.run(
+        run_load(args.host, args.port, args.clients, args.duration, width, height, args.density))
+    if failures:
+        print(f"[WARNING] {len(failures)} 个模拟玩家异常退出，例如: {failures[0]!r}")
+    stats.latencies.sort()
+    moves = len(stats.latencies)
+    print(f"模拟玩家 {args.clients}，棋盘 {width}x{height}@{args.density:g}，时长 {elapsed:.1f} 秒")
+    print(f"请求 {moves}，{moves / elapsed:.0f} 步/秒，完成 {stats.games} 局，错误应答 {stats.errors}")
+    if moves:
+        print(f"平均应答 {stats.reply_bytes / moves:.0f} 字节（整盘 {width * height} 格）")
+        print(f"延迟 p50 {stats.percentile(0.5):.2f} ms  p90 {stats.percentile(0.9):.2f} ms  "
+              f"p99 {stats.percentile(0.99):.2f} ms  最大 {stats.latencies[-1] * 1000:.2f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
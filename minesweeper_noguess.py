@@ -0,0 +1,249 @@
+"""无猜棋盘：用求解器验证从首次点击起只靠推理就能解开的棋盘，由后台进程预先生成并按配置缓存到磁盘（不依赖pygame）
+
+首次点击固定在棋盘中心，而 place_mines 对相同的种子和首次点击位置总是生成相同的布雷，
+所以一个无猜棋盘只需保存它的种子（4字节）。开局时从缓存中取一个种子即可，无需等待生成。
+棋盘越大、地雷越密，随机棋盘无需猜测的概率越低（实测 100x60@15% 约 1/6，60x50@20% 已接近 0），
+因此只支持 supported() 范围内的配置。
+
+用法:
+    python minesweeper_noguess.py --size 30x20 --density 0.15 --count 50   # 预先填充缓存
+    python minesweeper_noguess.py --list                                   # 查看各配置的缓存数量
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from minesweeper_engine import MinesweeperEngine
+
+CACHE_DIR = "noguess_boards"
+POOL_TARGET = 20  # 每个配置在缓存中保持的棋盘数
+ATTEMPTS_PER_TASK = 64  # 每个后台任务最多尝试的种子数
+TASK_BUDGET = 0.5  # 每个后台任务最多运行的时间（秒），退出游戏时最多等待这么久
+MAX_CELLS = 50 * 40  # 支持的最大棋盘格数
+MAX_DENSITY = 0.2  # 支持的最大地雷比例
+IDLE_SHUTDOWN = 30  # 缓存补足后工作进程空闲多少秒后退出（秒）
+SEED = struct.Struct("<I")
+
+
+def supported(width, height, density):
+    """该配置能否在合理时间内生成无猜棋盘"""
+    return width * height <= MAX_CELLS and density <= MAX_DENSITY
+
+
+def start_cell(width, height):
+    """无猜棋盘的首次点击位置"""
+    return width // 2, height // 2
+
+
+def is_no_guess(width, height, density, seed):
+    """从中心首次点击开始，只揭示求解器确定安全的格子，能否一直推进到获胜"""
+    engine = MinesweeperEngine(width, height, density, seed=seed, history_limit=0)
+    engine.reveal(*start_cell(width, height))
+    solver = engine.solver
+    while not engine.game_over:
+        if engine.check_win():
+            return True
+        solver.step()
+        safe = solver.certain_safe()
+        if not safe:
+            return False
+        for x, y in safe:
+            engine.reveal(x, y)
+    return False
+
+
+def find_board(width, height, density, base_seed, attempts=ATTEMPTS_PER_TASK, budget=TASK_BUDGET):
+    """从 base_seed 起依次尝试种子，返回第一个无猜棋盘的种子；尝试次数或时间用完时返回 None"""
+    deadline = time.perf_counter() + budget
+    for n in range(attempts):
+        if time.perf_counter() > deadline:
+            break
+        seed = (base_seed + n) & 0xFFFFFFFF
+        if is_no_guess(width, height, density, seed):
+            return seed
+    return None
+
+
+def _lower_priority():
+    """工作进程降低优先级，不与游戏主进程争抢CPU"""
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+
+class BoardCache:
+    """磁盘上的无猜棋盘缓存：每个配置一个文件，依次存放种子"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+
+    def path(self, width, height, density):
+        return os.path.join(self.cache_dir, f"{width}x{height}@{density:g}.seeds")
+
+    def count(self, width, height, density):
+        try:
+            return os.path.getsize(self.path(width, height, density)) // SEED.size
+        except OSError:
+            return 0
+
+    def add(self, width, height, density, seeds):
+        with self.lock:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(self.path(width, height, density), 'ab') as f:
+                f.write(b"".join(SEED.pack(seed) for seed in seeds))
+
+    def take(self, width, height, density):
+        """取出并删除最后一个种子；缓存为空时返回 None"""
+        path = self.path(width, height, density)
+        with self.lock:
+            try:
+                with open(path, 'r+b') as f:
+                    size = os.fstat(f.fileno()).st_size
+                    size -= size % SEED.size
+                    if size < SEED.size:
+                        return None
+                    f.seek(size - SEED.size)
+                    seed, = SEED.unpack(f.read(SEED.size))
+                    f.truncate(size - SEED.size)
+                    return seed
+            except OSError:
+                return None
+
+    def configs(self):
+        """缓存中的所有配置及数量：[(文件名, 数量)]"""
+        try:
+            names = sorted(name for name in os.listdir(self.cache_dir) if name.endswith(".seeds"))
+        except OSError:
+            return []
+        return [(name[:-len(".seeds")], os.path.getsize(os.path.join(self.cache_dir, name)) // SEED.size)
+                for name in names]
+
+
+class BoardPool:
+    """无猜棋盘池：take 直接从缓存取种子，同时让后台线程用工作进程把该配置补足到 target 个"""
+
+    def __init__(self, cache_dir=CACHE_DIR, target=POOL_TARGET, workers=None):
+        self.cache = BoardCache(cache_dir)
+        self.target = target
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)  # 留一个核心给游戏
+        self.wanted = None  # 最近请求补充的配置
+        self.wakeup = threading.Event()
+        self.thread = None
+        self.executor = None
+        self.futures = []  # 正在进行的一批任务
+        self.closed = False
+
+    def take(self, width, height, density):
+        """取一个无猜棋盘的种子并在后台补充；缓存为空或配置不受支持时返回 None"""
+        if not supported(width, height, density):
+            return None
+        seed = self.cache.take(width, height, density)
+        self.fill(width, height, density)
+        return seed
+
+    def fill(self, width, height, density):
+        """在后台把该配置的缓存补足到 target 个；只补充最近请求的配置"""
+        self.wanted = (width, height, density)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="noguess-pool", daemon=True)
+            self.thread.start()
+        self.wakeup.set()
+
+    def close(self):
+        """停止补充并取消尚未开始的任务；正在运行的任务最多还需 TASK_BUDGET 秒"""
+        self.closed = True
+        self.wakeup.set()
+        # 逐个取消而不是 shutdown(cancel_futures=True)：打包使用的 Python 3.8 还不支持该参数
+        for future in self.futures:
+            future.cancel()
+        executor = self.executor
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _run(self):
+        rng = random.Random()
+        try:
+            while not self.closed:
+                if not self.wakeup.wait(IDLE_SHUTDOWN if self.executor else None):
+                    # 长时间没有新的需求，让工作进程退出以释放内存
+                    self.executor.shutdown(wait=True)
+                    self.executor = None
+                    continue
+                self.wakeup.clear()
+                config = self.wanted
+                while not self.closed and config == self.wanted and self.cache.count(*config) < self.target:
+                    if self.executor is None:
+                        # spawn 启动的子进程不继承游戏窗口和音频等状态，在各平台上行为一致
+                        self.executor = ProcessPoolExecutor(self.workers, initializer=_lower_priority,
+                                                            mp_context=multiprocessing.get_context("spawn"))
+                    futures = self.futures = [self.executor.submit(find_board, *config, rng.getrandbits(32))
+                                              for _ in range(self.workers)]
+                    found = [future.result() for future in as_completed(futures) if not future.cancelled()]
+                    found = [seed for seed in found if seed is not None]
+                    if found:
+                        self.cache.add(*config, found)
+        except Exception as e:
+            if not self.closed:  # 关闭时提交任务可能因执行器已关闭而失败
+                print(f"[ERROR] 无猜棋盘后台生成失败: {e}")
+        finally:
+            for future in self.futures:
+                future.cancel()
+            if self.executor is not None:
+                self.executor.shutdown(wait=False)
+
+
+def generate(width, height, density, count, workers=None, cache_dir=CACHE_DIR):
+    """用所有CPU核心生成 count 个无猜棋盘写入缓存，返回 (生成数, 尝试数, 秒)"""
+    cache = BoardCache(cache_dir)
+    rng = random.Random()
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    made = 0
+    tasks = 0
+    with ProcessPoolExecutor(workers) as executor:
+        while made < count:
+            futures = [executor.submit(find_board, width, height, density, rng.getrandbits(32))
+                       for _ in range(workers)]
+            tasks += len(futures)
+            found = [seed for seed in (future.result() for future in as_completed(futures)) if seed is not None]
+            found = found[:count - made]
+            cache.add(width, height, density, found)
+            made += len(found)
+    return made, tasks, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="预先生成无猜棋盘缓存")
+    parser.add_argument("--size", default="30x20", help="棋盘尺寸，如 30x20")
+    parser.add_argument("--density", type=float, default=0.15, help="地雷比例")
+    parser.add_argument("--count", type=int, default=POOL_TARGET, help="生成的棋盘数")
+    parser.add_argument("--workers", type=int, help="工作进程数（默认CPU核心数）")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--list", action="store_true", help="只列出各配置的缓存数量")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, count in BoardCache(args.cache_dir).configs():
+            print(f"{name:<24} {count:>6}")
+        return 0
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    if not supported(width, height, args.density):
+        print(f"[ERROR] 无猜棋盘只支持不超过 {MAX_CELLS} 格、地雷比例不超过 {MAX_DENSITY:g} 的配置")
+        return 1
+    made, tasks, seconds = generate(width, height, args.density, args.count, args.workers, args.cache_dir)
+    print(f"生成 {made} 个 {width}x{height}@{args.density:g} 无猜棋盘，{tasks} 个任务，耗时 {seconds:.1f} 秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""扫雷对局录像：紧凑记录每次揭示、标记、双击揭示、道具和撤销/重做操作，并可无界面极速重放或按倍速渲染重放
+
+录像格式（小端）：
+    文件头   魔数 b"MSRP"、版本号，以及棋盘尺寸、地雷比例、道具大小、布雷种子、开局总积分、录制时间（见 HEADER）
+    操作     每条 9 字节：距开局的毫秒数、操作类型、x、y（见 ACTION）
+布雷只取决于种子和首次点击位置，因此重放时按相同顺序执行这些操作即可得到完全相同的对局。
+
+用法:
+    python minesweeper_replay.py minesweeper_last.replay            # 无界面极速重放并输出每步耗时统计
+    python minesweeper_replay.py crash_report_20261018_120000.replay --render --speed 4
+"""
+
+import argparse
+import struct
+import sys
+import time
+
+from minesweeper_engine import MinesweeperEngine
+from minesweeper_save import write_atomic
+
+REPLAY_MAGIC = b"MSRP"
+REPLAY_VERSION = 1
+
+# 魔数, 版本, 宽, 高, 地雷比例, 道具大小, 种子, 开局总积分, 录制时间
+HEADER = struct.Struct("<4sHHHdBQqd")
+# 毫秒, 操作, x, y
+ACTION = struct.Struct("<IBHH")
+
+ACTION_REVEAL = 1
+ACTION_FLAG = 2
+ACTION_CHORD = 3
+ACTION_TOOL = 4
+ACTION_UNDO = 5
+ACTION_REDO = 6
+ACTION_NAMES = {ACTION_REVEAL: "reveal", ACTION_FLAG: "flag", ACTION_CHORD: "chord", ACTION_TOOL: "tool",
+                ACTION_UNDO: "undo", ACTION_REDO: "redo"}
+
+
+class ReplayError(Exception):
+    """录像损坏或版本不受支持"""
+
+
+class ReplayRecorder:
+    """记录一局中的操作；种子在首次点击布雷后才确定，由调用方届时填入 seed"""
+
+    def __init__(self, width, height, mine_percentage, tool_size, total_score=0):
+        self.width = width
+        self.height = height
+        self.mine_percentage = mine_percentage
+        self.tool_size = tool_size
+        self.total_score = total_score
+        self.seed = None
+        self.recorded_at = time.time()
+        self.start = time.perf_counter()
+        self.actions = bytearray()
+
+    def record(self, action, x, y):
+        ms = int((time.perf_counter() - self.start) * 1000)
+        self.actions += ACTION.pack(ms, action, x, y)
+
+    def __len__(self):
+        return len(self.actions) // ACTION.size
+
+    def to_bytes(self):
+        header = HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.width, self.height, self.mine_percentage,
+                             self.tool_size, self.seed or 0, self.total_score, self.recorded_at)
+        return header + bytes(self.actions)
+
+    def save(self, path):
+        write_atomic(path, self.to_bytes())
+
+
+class Replay:
+    """读入的录像：对局参数和 (毫秒, 操作, x, y) 列表"""
+
+    def __init__(self, width, height, mine_percentage, tool_size, seed, total_score, recorded_at, actions):
+        self.width = width
+        self.height = height
+        self.mine_percentage = mine_percentage
+        self.tool_size = tool_size
+        self.seed = seed
+        self.total_score = total_score
+        self.recorded_at = recorded_at
+        self.actions = actions
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ReplayError("录像长度不足")
+        (magic, version, width, height, mine_percentage, tool_size, seed, total_score,
+         recorded_at) = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ReplayError("不是扫雷录像")
+        if version > REPLAY_VERSION:
+            raise ReplayError(f"录像版本 {version} 过新")
+        body = memoryview(data)[HEADER.size:]
+        if len(body) % ACTION.size:
+            raise ReplayError("录像操作记录不完整")
+        actions = list(ACTION.iter_unpack(body))
+        return cls(width, height, mine_percentage, tool_size, seed, total_score, recorded_at, actions)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+    def duration(self):
+        """录像时长（秒）"""
+        return self.actions[-1][0] / 1000 if self.actions else 0.0
+
+
+def new_engine(replay, engine_class=MinesweeperEngine):
+    engine = engine_class(replay.width, replay.height, replay.mine_percentage, replay.tool_size, seed=replay.seed)
+    engine.total_score = replay.total_score
+    return engine
+
+
+def apply_action(engine, action, x, y):
+    """在引擎上执行一条录像操作"""
+    if action == ACTION_REVEAL:
+        engine.reveal(x, y)
+    elif action == ACTION_FLAG:
+        engine.toggle_flag(x, y)
+    elif action == ACTION_CHORD:
+        engine.reveal_around(x, y)
+    elif action == ACTION_TOOL:
+        engine.use_tool(x, y)
+    elif action == ACTION_UNDO:
+        engine.undo()
+    elif action == ACTION_REDO:
+        engine.redo()
+    else:
+        raise ReplayError(f"未知操作类型: {action}")
+
+
+def play_headless(replay, engine=None):
+    """无界面按最快速度重放，返回 (引擎, 每步耗时列表[(操作, 秒)])"""
+    engine = engine or new_engine(replay)
+    timings = []
+    for _, action, x, y in replay.actions:
+        start = time.perf_counter()
+        apply_action(engine, action, x, y)
+        timings.append((action, time.perf_counter() - start))
+    return engine, timings
+
+
+def summarize_timings(timings):
+    """按操作类型汇总：次数、总耗时、p50、p99（毫秒）"""
+    groups = {}
+    for action, seconds in timings:
+        groups.setdefault(ACTION_NAMES.get(action, str(action)), []).append(seconds)
+    rows = []
+    for name, values in sorted(groups.items()):
+        values.sort()
+        rows.append({
+            "action": name,
+            "count": len(values),
+            "total_ms": 1000 * sum(values),
+            "p50_ms": 1000 * values[len(values) // 2],
+            "p99_ms": 1000 * values[min(len(values) - 1, int(len(values) * 0.99))],
+        })
+    return rows
+
+
+def play_rendered(replay, speed=1.0):
+    """在游戏窗口中按 speed 倍速重放（需要pygame）"""
+    import pygame
+    import 扫雷 as ui
+
+    # 重放的结果和积分不属于玩家，不写入结果库、总积分和自动存档；棋盘完全由录像中的种子决定，不用无猜模式
+    game = ui.Minesweeper(spectating=True)
+    game.original_width, game.original_height = replay.width, replay.height
+    game.original_mine_percentage = replay.mine_percentage
+    game.original_tool_size = replay.tool_size
+    game.original_seed = replay.seed
+    game.reset_game()
+    game.stop_recording()  # 重放本身不再录像
+    game.total_score = replay.total_score
+    clock = pygame.time.Clock()
+    start = time.perf_counter()
+    pending = list(replay.actions)
+    pending.reverse()
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return game
+            if event.type in (pygame.VIDEORESIZE, pygame.MOUSEWHEEL, pygame.KEYDOWN, ui.ASSETS_READY, ui.IMAGE_READY):
+                game.handle_event(event)
+        elapsed_ms = (time.perf_counter() - start) * 1000 * speed
+        while pending and pending[-1][0] <= elapsed_ms:
+            _, action, x, y = pending.pop()
+            apply_action(game, action, x, y)
+        if not game.game_over and not game.win:
+            game.win = game.check_win()
+        game.sound_manager.flush()
+        game.draw()
+        clock.tick(60)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫雷对局录像重放")
+    parser.add_argument("path", help="录像文件")
+    parser.add_argument("--render", action="store_true", help="在游戏窗口中重放")
+    parser.add_argument("--speed", type=float, default=1.0, help="渲染重放的倍速")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    print(f"录像: {replay.width}x{replay.height} 地雷比例 {replay.mine_percentage:.0%} 种子 {replay.seed} "
+          f"共 {len(replay.actions)} 步，时长 {replay.duration():.1f} 秒")
+    if args.render:
+        play_rendered(replay, args.speed)
+        return 0
+    start = time.perf_counter()
+    engine, timings = play_headless(replay)
+    total = time.perf_counter() - start
+    result = "获胜" if engine.check_win() and not engine.game_over else ("失败" if engine.game_over else "未结束")
+    print(f"重放完成: {result}，积分 {engine.score}，耗时 {total * 1000:.1f} ms")
+    print(f"{'操作':<8} {'次数':>8} {'总毫秒':>10} {'p50毫秒':>10} {'p99毫秒':>10}")
+    for row in summarize_timings(timings):
+        print(f"{row['action']:<8} {row['count']:>8} {row['total_ms']:>10.2f} {row['p50_ms']:>10.3f} {row['p99_ms']:>10.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""扫雷存档格式（不依赖pygame）
+
+二进制格式（小端）：
+    文件头   魔数 b"MSWP"、版本号，以及尺寸、积分、时间、种子等元数据（见 HEADER）
+    棋盘     地雷、揭示、标记三个平面，各按位打包（每格1位，高位在前，末字节补0）
+    校验     前面全部内容的 CRC32
+周围雷数由地雷平面推导，不写入文件。写入先写临时文件再原子替换，中途崩溃不会损坏旧存档。
+不是此格式的文件按旧版 pickle 存档读取并转换，读取时只允许还原存档中会出现的类型。
+"""
+
+import io
+import os
+import pickle
+import struct
+import time
+import zlib
+
+from minesweeper_engine import Board
+
+SAVE_MAGIC = b"MSWP"
+SAVE_VERSION = 1
+
+# 魔数, 版本, 宽, 高, 状态位, 单局积分, 总积分, 用时, 单元格大小, 道具大小, 地雷比例, 种子, 首次点击x, 首次点击y, 保存时间
+HEADER = struct.Struct("<4sHIIBqqdHHdQiid")
+
+FLAG_GAME_OVER = 1
+FLAG_WIN = 2
+FLAG_FIRST_CLICK = 4
+FLAG_SHOW_TIME = 8
+FLAG_HAS_SEED = 16
+
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+_FROM_DIGITS = bytes.maketrans(b"01", b"\x00\x01")
+
+
+class SaveError(Exception):
+    """存档损坏或版本不受支持"""
+
+
+class _LegacyCell:
+    """旧版存档中的单元格对象（只用于读取其属性）"""
+
+
+class _LegacyUnpickler(pickle.Unpickler):
+    """只允许还原旧版存档中出现的类型，拒绝任意对象构造"""
+    ALLOWED = {
+        ('builtins', 'bytearray'), ('builtins', 'set'), ('builtins', 'frozenset'),
+        ('builtins', 'object'), ('copyreg', '_reconstructor'),
+    }
+
+    def find_class(self, module, name):
+        if name == 'Cell':
+            return _LegacyCell
+        if (module, name) == ('minesweeper_engine', 'Board'):
+            return Board
+        if (module, name) in self.ALLOWED:
+            return super().find_class(module, name)
+        raise SaveError(f"旧存档包含不允许的类型: {module}.{name}")
+
+
+def pack_bits(plane):
+    """把每格1字节的0/1平面打包成每格1位"""
+    if not plane:
+        return b""
+    nbytes = (len(plane) + 7) // 8
+    digits = plane.translate(_TO_DIGITS) + b"0" * (nbytes * 8 - len(plane))
+    return int(digits, 2).to_bytes(nbytes, "big")
+
+
+def unpack_bits(data, size):
+    """pack_bits 的逆运算，返回长度为 size 的 bytearray"""
+    if not size:
+        return bytearray()
+    digits = format(int.from_bytes(data, "big"), f"0{len(data) * 8}b")[:size]
+    return bytearray(digits.encode("ascii").translate(_FROM_DIGITS))
+
+
+def encode_state(state):
+    """把游戏状态字典编码为存档字节"""
+    board = state['board']
+    flags = 0
+    if state.get('game_over'):
+        flags |= FLAG_GAME_OVER
+    if state.get('win'):
+        flags |= FLAG_WIN
+    if state.get('first_click'):
+        flags |= FLAG_FIRST_CLICK
+    if state.get('show_time', True):
+        flags |= FLAG_SHOW_TIME
+    seed = state.get('seed')
+    if seed is not None:
+        flags |= FLAG_HAS_SEED
+    first_x, first_y = state.get('first_click_pos') or (-1, -1)
+    header = HEADER.pack(
+        SAVE_MAGIC, SAVE_VERSION, board.width, board.height, flags,
+        state.get('score', 0), state.get('total_score', 0), state.get('game_time', 0),
+        state.get('cell_size', 0), state.get('tool_size', 3), state.get('mine_percentage', 0.0),
+        seed or 0, first_x, first_y, time.time())
+    body = header + pack_bits(board.mines) + pack_bits(board.revealed) + pack_bits(board.flagged)
+    return body + struct.pack("<I", zlib.crc32(body))
+
+
+def decode_state(data):
+    """解码存档字节，返回游戏状态字典（'board' 为重建好的 Board）"""
+    if len(data) < HEADER.size + 4:
+        raise SaveError("存档长度不足")
+    body, (crc,) = data[:-4], struct.unpack("<I", data[-4:])
+    if zlib.crc32(body) != crc:
+        raise SaveError("存档校验失败")
+    (magic, version, width, height, flags, score, total_score, game_time, cell_size,
+     tool_size, mine_percentage, seed, first_x, first_y, saved_at) = HEADER.unpack_from(body)
+    if magic != SAVE_MAGIC:
+        raise SaveError("不是扫雷存档")
+    if version > SAVE_VERSION:
+        raise SaveError(f"存档版本 {version} 过新")
+    size = width * height
+    nbytes = (size + 7) // 8
+    if len(body) != HEADER.size + 3 * nbytes:
+        raise SaveError("存档长度与棋盘尺寸不符")
+    offset = HEADER.size
+    board = Board(width, height)
+    board.mines[:] = unpack_bits(body[offset:offset + nbytes], size)
+    board.revealed[:] = unpack_bits(body[offset + nbytes:offset + 2 * nbytes], size)
+    board.flagged[:] = unpack_bits(body[offset + 2 * nbytes:offset + 3 * nbytes], size)
+    board.compute_neighbor_counts()
+    board.recount()
+    return {
+        'width': width,
+        'height': height,
+        'board': board,
+        'score': score,
+        'game_over': bool(flags & FLAG_GAME_OVER),
+        'win': bool(flags & FLAG_WIN),
+        'first_click': bool(flags & FLAG_FIRST_CLICK),
+        'total_score': total_score,
+        'game_time': game_time,
+        'show_time': bool(flags & FLAG_SHOW_TIME),
+        'cell_size': cell_size,
+        'tool_size': tool_size,
+        'mine_percentage': mine_percentage,
+        'seed': seed if flags & FLAG_HAS_SEED else None,
+        'first_click_pos': (first_x, first_y) if first_x >= 0 else None,
+        'saved_at': saved_at,
+    }
+
+
+def write_atomic(path, data):
+    """先写临时文件并落盘，再原子替换目标文件"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def save_state(path, state):
+    write_atomic(path, encode_state(state))
+
+
+def load_state(path):
+    """读取存档；旧版 pickle 存档会被转换成与新格式相同的状态字典"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:len(SAVE_MAGIC)] == SAVE_MAGIC:
+        return decode_state(data)
+    return migrate_pickle_state(_LegacyUnpickler(io.BytesIO(data)).load())
+
+
+def migrate_pickle_state(state):
+    """把旧版 pickle 存档（棋盘为 Cell 二维列表或 Board 对象）转换为当前的状态字典"""
+    state = dict(state)
+    board = state['board']
+    if isinstance(board, list):
+        board = Board.from_cells(board)
+    state['board'] = board
+    state['width'] = board.width
+    state['height'] = board.height
+    return state
@@ -0,0 +1,244 @@
+"""扫雷多会话服务器：一个进程用 asyncio 同时托管大量无界面对局（不依赖pygame）
+
+每个 TCP 连接对应一个会话，会话内用 MinesweeperEngine 执行规则。协议为按行分隔的 JSON：
+
+    请求  {"id": 1, "op": "new", "width": 30, "height": 20, "density": 0.15, "tool_size": 3, "seed": 42}
+          {"id": 2, "op": "reveal", "x": 15, "y": 10}     # op 还可以是 flag / chord / tool / undo / redo
+    应答  {"id": 2, "cells": [i, s, i, s, ...], "score": 35, "state": "playing"}
+          {"id": 3, "error": "..."}
+
+应答只包含这一步状态改变的格子（下标 i = y * width + x 与状态 s，见 CELL_*），不发送整个棋盘；
+失败时附带所有地雷的位置（撤销失败时再发送它们的当前状态）。state 为 playing / won / lost。
+
+用法:
+    python minesweeper_server.py --port 8765
+    python minesweeper_loadgen.py --port 8765 --clients 2000 --duration 10
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from minesweeper_engine import MinesweeperEngine
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MIN_SESSION_SIZE = 5
+MAX_SESSION_CELLS = 200 * 200  # 单个会话的棋盘上限，避免一次大范围连锁阻塞其他会话
+SESSION_HISTORY_LIMIT = 50  # 每个会话可撤销的步数（会话数量多，历史不宜过长）
+STATS_INTERVAL = 5.0  # 服务器统计输出间隔（秒）
+MAX_REQUEST_BYTES = 64 * 1024  # 单行请求的长度上限（asyncio 流的缓冲上限）
+
+# 格子状态：0-8 为已揭示的周围雷数
+CELL_MINE = 9
+CELL_FLAGGED = 10
+CELL_HIDDEN = 11
+
+
+def cell_state(board, i, lost=False):
+    """格子 i 对客户端可见的状态；失败后所有地雷都公开，无论是否已揭示或标记"""
+    if lost and board.mines[i]:
+        return CELL_MINE
+    if board.flagged[i]:
+        return CELL_FLAGGED
+    if not board.revealed[i]:
+        return CELL_HIDDEN
+    if board.mines[i]:
+        return CELL_MINE
+    return board.counts[i]
+
+
+class RequestError(Exception):
+    """请求格式错误或参数超出范围，作为 error 应答返回给客户端"""
+
+
+class NullSolver:
+    """会话不提供提示，不需要增量推理；接口与 Solver 中引擎会调用的部分一致"""
+
+    def __init__(self, board, total_mines=0):
+        self.total_mines = total_mines
+        self.queue = []
+
+    def update(self, indices):
+        pass
+
+    def sync(self):
+        pass
+
+    def add_mines(self, cells):
+        pass
+
+    def add_safe(self, cells):
+        pass
+
+
+class SessionEngine(MinesweeperEngine):
+    """收集每一步状态改变的格子，供应答只发送差异"""
+    solver_class = NullSolver
+
+    def __init__(self, *args, **kwargs):
+        self.changed = set()
+        super().__init__(*args, history_limit=SESSION_HISTORY_LIMIT, **kwargs)
+
+    def on_event(self, name, cells=None):
+        if cells:
+            self.changed.update(cells)
+
+
+class Session:
+    """一个连接上的对局"""
+
+    def __init__(self):
+        self.engine = None
+
+    def new_game(self, request):
+        width = int(request.get("width", 30))
+        height = int(request.get("height", 20))
+        density = float(request.get("density", 0.15))
+        tool_size = int(request.get("tool_size", 3))
+        seed = request.get("seed")
+        if width < MIN_SESSION_SIZE or height < MIN_SESSION_SIZE or width * height > MAX_SESSION_CELLS:
+            raise RequestError(f"棋盘尺寸超出范围（每边至少 {MIN_SESSION_SIZE}，总格数不超过 {MAX_SESSION_CELLS}）")
+        if not 0.01 <= density <= 0.3 or not 3 <= tool_size <= 7:
+            raise RequestError("地雷比例或道具大小超出范围")
+        self.engine = SessionEngine(width, height, density, tool_size, seed=None if seed is None else int(seed))
+        return {"width": width, "height": height, "mines": self.engine.total_mines, "cells": [],
+                "score": 0, "state": "playing"}
+
+    def move(self, op, request):
+        engine = self.engine
+        if engine is None:
+            raise RequestError("请先发送 new 开始对局")
+        was_over = engine.game_over
+        engine.changed.clear()
+        if op in ("reveal", "flag", "chord", "tool"):
+            x, y = int(request["x"]), int(request["y"])
+            if not engine.board.in_bounds(x, y):
+                raise RequestError("坐标超出棋盘")
+            if engine.game_over or engine.win:
+                raise RequestError("对局已结束")
+            if op == "reveal":
+                engine.reveal(x, y)
+            elif op == "flag":
+                engine.toggle_flag(x, y)
+            elif op == "chord":
+                engine.reveal_around(x, y)
+            elif not engine.use_tool(x, y):
+                raise RequestError("积分不足")
+        elif op == "undo":
+            engine.undo()
+        elif op == "redo":
+            engine.redo()
+        else:
+            raise RequestError(f"未知操作: {op}")
+        if not engine.game_over:
+            engine.win = engine.check_win()
+        board = engine.board
+        indices = set(engine.changed)
+        if engine.game_over != was_over:
+            # 失败时一次性公开所有地雷，撤销失败时再把它们恢复为未揭示或标记
+            i = board.mines.find(1)
+            while i != -1:
+                indices.add(i)
+                i = board.mines.find(1, i + 1)
+        cells = []
+        lost = engine.game_over
+        for i in sorted(indices):
+            cells.append(i)
+            cells.append(cell_state(board, i, lost))
+        state = "lost" if engine.game_over else ("won" if engine.win else "playing")
+        return {"cells": cells, "score": engine.score, "state": state}
+
+    def handle(self, request):
+        op = request.get("op")
+        if op == "new":
+            return self.new_game(request)
+        return self.move(op, request)
+
+
+class MinesweeperServer:
+    """asyncio 服务器：每个连接一个 Session，所有会话在同一个事件循环中执行"""
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, stats_interval=STATS_INTERVAL):
+        self.host = host
+        self.port = port
+        self.stats_interval = stats_interval
+        self.sessions = set()
+        self.moves = 0
+        self.server = None
+
+    async def handle_client(self, reader, writer):
+        session = Session()
+        self.sessions.add(session)
+        dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # 超长的行已被部分丢弃，之后的数据无法可靠地按行分隔，回复错误后断开
+                    print(f"[WARNING] 请求超过 {MAX_REQUEST_BYTES} 字节，断开连接")
+                    writer.write(dumps({"error": f"请求超过 {MAX_REQUEST_BYTES} 字节"}).encode("utf-8") + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                request = {}
+                try:
+                    request = json.loads(line)
+                    reply = session.handle(request)
+                    self.moves += 1
+                except RequestError as e:
+                    reply = {"error": str(e)}
+                except (ValueError, KeyError, TypeError, AttributeError, OverflowError) as e:
+                    reply = {"error": f"请求格式错误: {e}"}
+                if isinstance(request, dict) and "id" in request:
+                    reply["id"] = request["id"]
+                writer.write(dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.sessions.discard(session)
+            writer.close()
+
+    async def report_stats(self):
+        last_moves = self.moves
+        last_time = time.perf_counter()
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            now = time.perf_counter()
+            rate = (self.moves - last_moves) / (now - last_time)
+            print(f"[INFO] 会话 {len(self.sessions)}，{rate:.0f} 步/秒，累计 {self.moves} 步")
+            last_moves, last_time = self.moves, now
+
+    async def serve(self):
+        self.server = await asyncio.start_server(self.handle_client, self.host, self.port, backlog=4096,
+                                                 limit=MAX_REQUEST_BYTES)
+        print(f"[INFO] 扫雷服务器已启动: {self.host}:{self.port}")
+        stats = asyncio.create_task(self.report_stats()) if self.stats_interval else None
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            if stats:
+                stats.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫雷多会话服务器")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL, help="统计输出间隔（秒），0 表示不输出")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(MinesweeperServer(args.host, args.port, args.stats_interval).serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
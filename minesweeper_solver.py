@@ -0,0 +1,264 @@
+"""扫雷约束传播求解器（不依赖pygame）
+
+只使用玩家可见的信息（已揭示格子的数字）推理，从不读取未揭示格子的地雷状态。
+玩家插的旗子可能是错的，因此不作为推理依据；道具标记的地雷是确定的，可以通过 add_mines 告知求解器。
+"""
+
+import time
+
+
+class Solver:
+    """增量约束传播求解器
+
+    每个已揭示的数字格是一条约束：其未确定邻居中恰有 (数字 - 已确定地雷邻居数) 个地雷。
+    揭示只把格子记入 pending，推理时（step/probabilities）才登记为约束；
+    求解器维护一个待检查约束队列，每步之后只重新检查受影响的约束，而不是重解整个棋盘：
+      - 单约束规则：剩余雷数为0则邻居全安全，等于未确定邻居数则全是雷；
+      - 子集规则：约束A的未确定格是约束B的子集时，差集中恰有 (B剩余 - A剩余) 个雷。
+    """
+
+    def __init__(self, board, total_mines=0):
+        self.board = board
+        self.total_mines = total_mines
+        self.safe = set()    # 推理出的安全格下标（尚未揭示）
+        self.mines = set()   # 推理出或已确认的地雷下标
+        self.frontier = set()  # 仍有未确定邻居的已揭示数字格
+        self.queue = []
+        self.queued = set()
+        self.pending = []  # 新揭示但尚未登记的格子下标，推理时才处理
+        self.stale = False  # 已揭示的格子被撤销，推理前需要按当前局面重建
+
+    # ---- 输入 ----
+    def update(self, indices):
+        """新揭示一批格子（下标）后调用；只记录下来，直到需要推理时才把受影响的约束加入队列
+
+        揭示本身因此几乎没有额外开销，从不提示的对局也不会为求解器付出任何代价。
+        """
+        self.pending.extend(indices)
+
+    def sync(self):
+        """标记为需要按当前局面重建（用于读档、撤销揭示等），重建推迟到下一次推理，耗时与已揭示格数成正比"""
+        self.stale = True
+
+    def _rebuild(self):
+        self.stale = False
+        self.safe.clear()
+        self.mines.clear()
+        self.frontier.clear()
+        self.queue.clear()
+        self.queued.clear()
+        revealed = self.board.revealed
+        pending = []
+        i = revealed.find(1)
+        while i != -1:
+            pending.append(i)
+            i = revealed.find(1, i + 1)
+        self.pending = pending
+
+    def _flush(self):
+        """登记新揭示的格子：新的数字格成为约束，旧约束中与新格子相邻的重新检查
+
+        空白格不是约束，因此不入队；旧约束只需在 frontier 中查找（没有未确定邻居的约束不受影响），
+        按新格子数与 frontier 大小选择较小的一侧遍历。
+        """
+        if self.stale:
+            self._rebuild()
+        if not self.pending:
+            return
+        new = self.pending
+        self.pending = []
+        board = self.board
+        counts, mines = board.counts, board.mines
+        self.safe.difference_update(new)
+        frontier = self.frontier
+        if frontier:
+            width, height = board.width, board.height
+            if len(frontier) < len(new):
+                new_set = set(new)
+                touched = []
+                for k in frontier:
+                    y, x = divmod(k, width)
+                    if any(ny * width + nx in new_set
+                           for ny in range(max(0, y - 1), min(height, y + 2))
+                           for nx in range(max(0, x - 1), min(width, x + 2))):
+                        touched.append(k)
+            else:
+                touched = set()
+                for i in new:
+                    y, x = divmod(i, width)
+                    for ny in range(max(0, y - 1), min(height, y + 2)):
+                        for nx in range(max(0, x - 1), min(width, x + 2)):
+                            j = ny * width + nx
+                            if j in frontier:
+                                touched.add(j)
+            for k in touched:
+                self._enqueue(k)
+        for i in new:
+            if counts[i] and not mines[i]:
+                self._enqueue(i)
+
+    def add_mines(self, cells):
+        """登记已确认的地雷（如道具标出的地雷）"""
+        self._flush()
+        width = self.board.width
+        for x, y in cells:
+            self._mark_mine(y * width + x)
+
+    def add_safe(self, cells):
+        """登记已确认安全的格子（如道具范围内未标出地雷的格子）"""
+        self._flush()
+        width = self.board.width
+        revealed = self.board.revealed
+        for x, y in cells:
+            i = y * width + x
+            if not revealed[i]:
+                self._mark_safe(i)
+
+    def _enqueue(self, i):
+        if i not in self.queued:
+            self.queued.add(i)
+            self.queue.append(i)
+
+    # ---- 推理 ----
+    def _constraint(self, i):
+        """返回约束格 i 的 (未确定邻居集合, 其中剩余雷数)"""
+        board = self.board
+        width, height = board.width, board.height
+        revealed, safe, mines = board.revealed, self.safe, self.mines
+        y, x = divmod(i, width)
+        unknown = set()
+        remaining = board.counts[i]
+        for ny in range(max(0, y - 1), min(height, y + 2)):
+            for nx in range(max(0, x - 1), min(width, x + 2)):
+                j = ny * width + nx
+                if j in mines:
+                    remaining -= 1
+                elif not revealed[j] and j not in safe:
+                    unknown.add(j)
+        return unknown, remaining
+
+    def _mark_safe(self, i):
+        if i not in self.safe and i not in self.mines:
+            self.safe.add(i)
+            self._enqueue_around(i)
+
+    def _mark_mine(self, i):
+        if i not in self.mines:
+            self.safe.discard(i)
+            self.mines.add(i)
+            self._enqueue_around(i)
+
+    def _enqueue_around(self, i, radius=1):
+        board = self.board
+        width, height = board.width, board.height
+        revealed = board.revealed
+        y, x = divmod(i, width)
+        for ny in range(max(0, y - radius), min(height, y + radius + 1)):
+            for nx in range(max(0, x - radius), min(width, x + radius + 1)):
+                j = ny * width + nx
+                if revealed[j]:
+                    self._enqueue(j)
+
+    def step(self, budget=None):
+        """处理队列中的约束，budget 为时间预算（秒），超时后剩余工作留到下次；返回是否已处理完"""
+        deadline = None if budget is None else time.perf_counter() + budget
+        self._flush()
+        queue = self.queue
+        while queue:
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+            i = queue.pop()
+            self.queued.discard(i)
+            self._check(i)
+        return True
+
+    def _check(self, i):
+        if self.board.mines[i]:  # 已揭示的地雷（游戏结束）不是约束
+            return
+        unknown, remaining = self._constraint(i)
+        if not unknown:
+            self.frontier.discard(i)
+            return
+        self.frontier.add(i)
+        if remaining == 0:
+            for j in unknown:
+                self._mark_safe(j)
+            return
+        if remaining == len(unknown):
+            for j in unknown:
+                self._mark_mine(j)
+            return
+        # 子集规则：与两格范围内的其他约束比较
+        board = self.board
+        width, height = board.width, board.height
+        y, x = divmod(i, width)
+        for ny in range(max(0, y - 2), min(height, y + 3)):
+            for nx in range(max(0, x - 2), min(width, x + 3)):
+                k = ny * width + nx
+                if k == i or k not in self.frontier:
+                    continue
+                other, other_remaining = self._constraint(k)
+                if unknown < other:
+                    self._apply_difference(other - unknown, other_remaining - remaining)
+                elif other < unknown:
+                    self._apply_difference(unknown - other, remaining - other_remaining)
+
+    def _apply_difference(self, cells, mines):
+        if mines == 0:
+            for j in cells:
+                self._mark_safe(j)
+        elif mines == len(cells):
+            for j in cells:
+                self._mark_mine(j)
+
+    # ---- 输出 ----
+    def certain_safe(self):
+        """当前确定安全且未揭示的格子 (x, y) 列表"""
+        width = self.board.width
+        revealed = self.board.revealed
+        return [(i % width, i // width) for i in self.safe if not revealed[i]]
+
+    def certain_mines(self):
+        """当前确定是地雷的格子 (x, y) 列表"""
+        width = self.board.width
+        return [(i % width, i // width) for i in self.mines]
+
+    def probabilities(self):
+        """估计未确定格子的地雷概率
+
+        返回 (frontier_probs, other_prob)：frontier_probs 为前沿格子 (x, y) -> 概率，
+        other_prob 为不与任何数字相邻的格子的概率。前沿概率取相关约束的平均剩余密度（近似值）。
+        """
+        self._flush()
+        board = self.board
+        width = board.width
+        sums = {}
+        for i in self.frontier:
+            unknown, remaining = self._constraint(i)
+            if not unknown:
+                continue
+            ratio = remaining / len(unknown)
+            for j in unknown:
+                total, n = sums.get(j, (0.0, 0))
+                sums[j] = (total + ratio, n + 1)
+        frontier_probs = {(j % width, j // width): total / n for j, (total, n) in sums.items()}
+        unknown_total = board.size - board.revealed.count(1) - len(self.safe) - len(self.mines)
+        others = unknown_total - len(frontier_probs)
+        mines_left = self.total_mines - len(self.mines) - sum(frontier_probs.values())
+        other_prob = min(1.0, max(0.0, mines_left / others)) if others > 0 else 0.0
+        return frontier_probs, other_prob
+
+    def best_guess(self):
+        """没有确定安全格时，返回估计地雷概率最低的未确定格子 (x, y)；棋盘已无未确定格时返回 None"""
+        board = self.board
+        frontier_probs, other_prob = self.probabilities()
+        best = min(frontier_probs.items(), key=lambda item: item[1], default=None)
+        if best is not None and best[1] <= other_prob:
+            return best[0]
+        width = board.width
+        revealed = board.revealed
+        for i in range(board.size):
+            cell = (i % width, i // width)
+            if not revealed[i] and i not in self.safe and i not in self.mines and cell not in frontier_probs:
+                return cell
+        return best[0] if best is not None else None
@@ -0,0 +1,265 @@
+"""扫雷对局结果库：用本地 SQLite 记录每一局的结果，并提供最佳用时、胜率和连胜统计（不依赖pygame）
+
+每局结束时写入一行（配置、种子、用时、积分、结果、点击数），写入先在内存中攒批，
+flush 时在一个事务里批量提交，并在同一事务中更新每个配置的汇总行（局数、最佳用时、连胜等），
+统计界面只需读取汇总行，与已记录的局数无关。总积分也保存在库中，取代旧的 minesweeper_score.dat。
+
+用法:
+    python minesweeper_stats.py                           # 所有配置的统计
+    python minesweeper_stats.py --config 30x20@0.15/tool3  # 单个配置的排行榜
+    python minesweeper_stats.py --bench 50000             # 在临时库中生成对局并测量查询耗时
+"""
+
+import argparse
+import os
+import pickle
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from minesweeper_engine import config_key
+
+RESULTS_DB = "minesweeper_results.db"
+LEGACY_SCORE_FILE = "minesweeper_score.dat"
+BATCH_SIZE = 64  # 攒够这么多局自动提交一次
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    finished_at REAL NOT NULL,
+    config TEXT NOT NULL,
+    width INTEGER NOT NULL,
+    height INTEGER NOT NULL,
+    density REAL NOT NULL,
+    tool_size INTEGER NOT NULL,
+    seed INTEGER,
+    seconds REAL NOT NULL,
+    score INTEGER NOT NULL,
+    result TEXT NOT NULL CHECK (result IN ('win', 'lose')),
+    clicks INTEGER NOT NULL
+);
+-- 最佳用时：按配置筛选获胜的对局并按用时排序，索引直接给出有序结果
+CREATE INDEX IF NOT EXISTS idx_games_best ON games (config, result, seconds);
+-- 最近的对局：按配置和时间倒序扫描
+CREATE INDEX IF NOT EXISTS idx_games_history ON games (config, finished_at);
+-- 每个配置的汇总，随对局写入在同一事务中增量更新
+CREATE TABLE IF NOT EXISTS config_stats (
+    config TEXT PRIMARY KEY,
+    games INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    best_seconds REAL,
+    total_seconds REAL NOT NULL,
+    total_score INTEGER NOT NULL,
+    current_streak INTEGER NOT NULL,
+    longest_streak INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value
+);
+"""
+
+
+class ResultsStore:
+    """对局结果库；record_game 只写入内存缓冲，flush 时批量提交"""
+
+    def __init__(self, path=RESULTS_DB, legacy_score_file=LEGACY_SCORE_FILE):
+        self.path = path
+        # 游戏在后台线程打开后交给主线程使用，同一时刻只有一个线程访问连接
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.pending = []
+        self.pending_total = None
+        if legacy_score_file:
+            self._migrate_legacy_score(legacy_score_file)
+
+    def _migrate_legacy_score(self, path):
+        """首次使用时导入旧版 pickle 积分文件中的总积分"""
+        if self._meta("total_score") is not None or not os.path.exists(path):
+            return
+        try:
+            with open(path, 'rb') as f:
+                total = pickle.load(f)
+            if isinstance(total, int):
+                with self.conn:
+                    self._set_meta("total_score", total)
+                print(f"[INFO] 已从 {path} 导入总积分: {total}")
+        except Exception as e:
+            print(f"[WARNING] 导入旧积分文件失败: {e}")
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # ---- 写入 ----
+    def record_game(self, width, height, density, tool_size, seed, seconds, score, result, clicks, finished_at=None):
+        """记录一局结果（result 为 'win' 或 'lose'）；缓冲满 BATCH_SIZE 局时自动提交"""
+        self.pending.append((finished_at or time.time(), config_key(width, height, density, tool_size),
+                             width, height, density, tool_size, seed, seconds, score, result, clicks))
+        if len(self.pending) >= BATCH_SIZE:
+            self.flush()
+
+    def set_total_score(self, total):
+        self.pending_total = total
+
+    def flush(self):
+        """在一个事务中提交所有缓冲的写入"""
+        if not self.pending and self.pending_total is None:
+            return
+        with self.conn:
+            if self.pending:
+                self.conn.executemany(
+                    "INSERT INTO games (finished_at, config, width, height, density, tool_size, seed, seconds,"
+                    " score, result, clicks) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", self.pending)
+                self._update_summaries(self.pending)
+            if self.pending_total is not None:
+                self._set_meta("total_score", self.pending_total)
+        self.pending = []
+        self.pending_total = None
+
+    def _update_summaries(self, rows):
+        """按时间顺序把新对局累加到各配置的汇总行"""
+        summaries = {}
+        for finished_at, config, _, _, _, _, _, seconds, score, result, _ in sorted(rows):
+            summary = summaries.get(config)
+            if summary is None:
+                row = self.conn.execute(
+                    "SELECT games, wins, best_seconds, total_seconds, total_score, current_streak, longest_streak"
+                    " FROM config_stats WHERE config = ?", (config,)).fetchone()
+                summary = summaries[config] = list(row) if row else [0, 0, None, 0.0, 0, 0, 0]
+            summary[0] += 1
+            summary[3] += seconds
+            summary[4] += score
+            if result == 'win':
+                summary[1] += 1
+                summary[2] = seconds if summary[2] is None else min(summary[2], seconds)
+                summary[5] += 1
+                summary[6] = max(summary[6], summary[5])
+            else:
+                summary[5] = 0
+        self.conn.executemany("INSERT OR REPLACE INTO config_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              [(config, *summary) for config, summary in summaries.items()])
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    # ---- 查询 ----
+    def total_score(self):
+        if self.pending_total is not None:
+            return self.pending_total
+        value = self._meta("total_score")
+        return int(value) if value is not None else 0
+
+    def configs(self):
+        return [row[0] for row in self.conn.execute("SELECT config FROM config_stats ORDER BY config")]
+
+    def best_times(self, config, limit=10):
+        """某配置获胜对局中用时最短的 limit 局：[(用时, 积分, 点击数, 结束时间, 种子)]"""
+        return self.conn.execute(
+            "SELECT seconds, score, clicks, finished_at, seed FROM games"
+            " WHERE config = ? AND result = 'win' ORDER BY seconds LIMIT ?", (config, limit)).fetchall()
+
+    def recent_games(self, config, limit=20):
+        """某配置最近的 limit 局：[(结束时间, 结果, 用时, 积分)]"""
+        return self.conn.execute(
+            "SELECT finished_at, result, seconds, score FROM games WHERE config = ?"
+            " ORDER BY finished_at DESC LIMIT ?", (config, limit)).fetchall()
+
+    def stats(self, config):
+        """某配置的汇总：局数、胜局数、胜率、最佳用时、平均用时、平均积分、当前连胜、最长连胜"""
+        row = self.conn.execute(
+            "SELECT games, wins, best_seconds, total_seconds, total_score, current_streak, longest_streak"
+            " FROM config_stats WHERE config = ?", (config,)).fetchone()
+        games, wins, best, total_seconds, total_score, current_streak, longest_streak = row or (0, 0, None, 0.0, 0, 0, 0)
+        return {
+            "config": config,
+            "games": games,
+            "wins": wins,
+            "win_rate": wins / games if games else 0.0,
+            "best_seconds": best,
+            "avg_seconds": total_seconds / games if games else 0.0,
+            "avg_score": total_score / games if games else 0.0,
+            "current_streak": current_streak,
+            "longest_streak": longest_streak,
+        }
+
+
+def format_seconds(seconds):
+    if seconds is None:
+        return "-"
+    minutes, seconds = divmod(seconds, 60)
+    return f"{int(minutes):02d}:{seconds:05.2f}"
+
+
+def print_stats(store, configs):
+    print(f"{'配置':<28} {'局数':>8} {'胜率':>8} {'最佳用时':>10} {'平均积分':>10} {'当前连胜':>8} {'最长连胜':>8}")
+    for config in configs:
+        s = store.stats(config)
+        print(f"{config:<28} {s['games']:>8} {s['win_rate']:>8.1%} {format_seconds(s['best_seconds']):>10} "
+              f"{s['avg_score']:>10.1f} {s['current_streak']:>8} {s['longest_streak']:>8}")
+
+
+def print_leaderboard(store, config, limit=10):
+    print(f"排行榜 {config}:")
+    for rank, (seconds, score, clicks, finished_at, seed) in enumerate(store.best_times(config, limit), 1):
+        when = time.strftime("%Y-%m-%d %H:%M", time.localtime(finished_at))
+        print(f"{rank:>3}. {format_seconds(seconds):>9}  积分 {score:<8} 点击 {clicks:<6} {when}  种子 {seed}")
+
+
+def bench(games):
+    """在临时库中写入 games 局随机结果，测量批量写入与各项查询的耗时"""
+    rng = random.Random(0)
+    configs = [(30, 20, 0.15, 3), (16, 16, 0.15, 3), (100, 60, 0.2, 5)]
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ResultsStore(os.path.join(tmp, "bench.db"), legacy_score_file=None)
+        start = time.perf_counter()
+        now = time.time()
+        for n in range(games):
+            width, height, density, tool_size = rng.choice(configs)
+            win = rng.random() < 0.6
+            store.record_game(width, height, density, tool_size, n, rng.uniform(10, 600), rng.randrange(5000),
+                              'win' if win else 'lose', rng.randrange(20, 400), finished_at=now - games + n)
+        store.flush()
+        print(f"写入 {games} 局: {(time.perf_counter() - start) * 1000:.1f} ms")
+        config = config_key(*configs[0])
+        for name, query in (("排行榜", lambda: store.best_times(config)),
+                            ("最近对局", lambda: store.recent_games(config)),
+                            ("汇总统计", lambda: store.stats(config)),
+                            ("全部配置", lambda: [store.stats(c) for c in store.configs()])):
+            start = time.perf_counter()
+            query()
+            print(f"{name}: {(time.perf_counter() - start) * 1000:.2f} ms")
+        store.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫雷对局结果统计")
+    parser.add_argument("--db", default=RESULTS_DB, help="结果库路径")
+    parser.add_argument("--config", help="只显示此配置（如 30x20@0.15/tool3）并列出排行榜")
+    parser.add_argument("--limit", type=int, default=10, help="排行榜条数")
+    parser.add_argument("--bench", type=int, metavar="N", help="在临时库中生成 N 局并测量查询耗时")
+    args = parser.parse_args(argv)
+
+    if args.bench:
+        bench(args.bench)
+        return 0
+    store = ResultsStore(args.db, legacy_score_file=None)
+    print(f"总积分: {store.total_score()}")
+    configs = [args.config] if args.config else store.configs()
+    print_stats(store, configs)
+    if args.config:
+        print_leaderboard(store, args.config, args.limit)
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
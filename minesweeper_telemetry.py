@@ -0,0 +1,67 @@
+"""扫雷运行遥测：固定容量的环形缓冲区，记录最近的输入、操作、棋盘尺寸、帧耗时和资源加载结果（不依赖pygame）
+
+记录一条事件只是向 deque 追加一个 (时刻, 类别, 数据) 元组，数据原样保存（可以直接是 pygame 事件对象），
+格式化推迟到写报告时才进行，因此可以在每帧、每次输入时常开记录。缓冲区满后自动丢弃最早的事件。
+"""
+
+import time
+from collections import deque
+
+TELEMETRY_CAPACITY = 2048  # 保留的最近事件数
+SLOW_FRAME_MS = 50  # 报告中单独统计的慢帧阈值（毫秒）
+
+
+class TelemetryBuffer:
+    """最近事件的环形缓冲区；record 可在任意线程调用（deque.append 是原子的）"""
+
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        self.events = deque(maxlen=capacity)
+
+    def record(self, kind, data=None):
+        self.events.append((time.perf_counter(), kind, data))
+
+    def snapshot(self):
+        """当前缓冲区内容的副本（写报告时其他线程可能仍在记录）"""
+        for _ in range(3):
+            try:
+                return list(self.events)
+            except RuntimeError:  # 复制过程中 deque 被修改
+                continue
+        return []
+
+    def frame_summary(self, events=None):
+        """缓冲区中帧耗时的统计：帧数、p50、p99、最大值（毫秒）和慢帧数"""
+        events = self.snapshot() if events is None else events
+        frames = sorted(data[0] for _, kind, data in events if kind == "frame")
+        if not frames:
+            return None
+        return {
+            "frames": len(frames),
+            "p50_ms": frames[len(frames) // 2],
+            "p99_ms": frames[min(len(frames) - 1, int(len(frames) * 0.99))],
+            "max_ms": frames[-1],
+            "slow": sum(1 for ms in frames if ms >= SLOW_FRAME_MS),
+        }
+
+    def format_lines(self, now=None):
+        """按时间顺序格式化所有事件，时刻显示为距 now 的秒数"""
+        events = self.snapshot()
+        now = time.perf_counter() if now is None else now
+        lines = []
+        summary = self.frame_summary(events)
+        if summary:
+            lines.append(f"帧耗时: {summary['frames']} 帧，p50 {summary['p50_ms']:.2f} ms，p99 {summary['p99_ms']:.2f} ms，"
+                         f"最大 {summary['max_ms']:.2f} ms，超过 {SLOW_FRAME_MS} ms 的慢帧 {summary['slow']} 个")
+        if events:
+            lines.append(f"最近 {len(events)} 条事件（最早在 {now - events[0][0]:.1f} 秒前）:")
+        for t, kind, data in events:
+            lines.append(f"{t - now:>10.3f}s  {kind:<8} {format_data(data)}")
+        return lines
+
+
+def format_data(data):
+    if data is None:
+        return ""
+    if isinstance(data, tuple):
+        return " ".join(f"{value:.2f}" if isinstance(value, float) else str(value) for value in data)
+    return str(data)
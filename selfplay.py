@@ -0,0 +1,145 @@
+"""扫雷自动对局统计：用求解器策略在所有CPU核心上批量对局，按配置汇总胜率、积分和耗时
+
+每局结果立即追加写入JSONL文件，中断后用相同参数重新运行会跳过已完成的对局继续统计。
+
+用法:
+    python selfplay.py --sizes 30x20 100x60 --densities 0.1 0.15 0.2 --tool-sizes 3 5 --games 2000
+    python selfplay.py --report                      # 只汇总已有结果
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from minesweeper_engine import MinesweeperEngine, config_key
+
+DEFAULT_OUTPUT = "selfplay_results.jsonl"
+
+
+def play_game(width, height, density, tool_size, seed):
+    """用求解器策略完整下一局，返回结果记录
+
+    策略：有确定安全格就全部揭示；没有时若积分够用道具，就在概率最低的格子上使用道具，
+    否则揭示概率最低的格子。
+    """
+    start = time.perf_counter()
+    engine = MinesweeperEngine(width, height, density, tool_size, seed=seed)
+    solver = engine.solver
+    clicks = 1
+    tools = 0
+    engine.reveal(width // 2, height // 2)
+    while not engine.game_over and not engine.check_win():
+        solver.step()
+        safe = solver.certain_safe()
+        if safe:
+            for x, y in safe:
+                engine.reveal(x, y)
+            clicks += len(safe)
+            continue
+        guess = solver.best_guess()
+        if guess is None:
+            break
+        if engine.score >= engine.tool_cost and engine.use_tool(*guess):
+            tools += 1
+            continue
+        engine.reveal(*guess)
+        clicks += 1
+    return {
+        "config": config_key(width, height, density, tool_size),
+        "seed": seed,
+        "win": engine.check_win() and not engine.game_over,
+        "score": engine.score,
+        "clicks": clicks,
+        "tools": tools,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _play_task(task):
+    return play_game(*task)
+
+
+def load_results(path):
+    """读取已有结果（忽略中断时写了一半的最后一行）"""
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue
+    return results
+
+
+def summarize(results):
+    """按配置汇总：局数、胜率、平均积分、平均每局耗时"""
+    groups = {}
+    for r in results:
+        groups.setdefault(r["config"], []).append(r)
+    rows = []
+    for config, games in sorted(groups.items()):
+        n = len(games)
+        rows.append({
+            "config": config,
+            "games": n,
+            "win_rate": sum(g["win"] for g in games) / n,
+            "avg_score": sum(g["score"] for g in games) / n,
+            "avg_ms": 1000 * sum(g["seconds"] for g in games) / n,
+        })
+    return rows
+
+
+def print_summary(rows):
+    print(f"{'配置':<28} {'局数':>8} {'胜率':>8} {'平均积分':>10} {'每局毫秒':>10}")
+    for row in rows:
+        print(f"{row['config']:<28} {row['games']:>8} {row['win_rate']:>8.1%} "
+              f"{row['avg_score']:>10.1f} {row['avg_ms']:>10.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="扫雷自动对局统计")
+    parser.add_argument("--sizes", nargs="+", default=["30x20"], help="棋盘尺寸，如 30x20")
+    parser.add_argument("--densities", nargs="+", type=float, default=[0.15], help="地雷比例")
+    parser.add_argument("--tool-sizes", nargs="+", type=int, default=[3], help="道具大小")
+    parser.add_argument("--games", type=int, default=1000, help="每个配置的对局数")
+    parser.add_argument("--seed", type=int, default=0, help="起始种子（第n局使用 seed+n）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="工作进程数")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="结果文件（JSONL，追加写入）")
+    parser.add_argument("--report", action="store_true", help="只汇总已有结果，不再对局")
+    args = parser.parse_args(argv)
+
+    done = load_results(args.output)
+    if not args.report:
+        finished = {(r["config"], r["seed"]) for r in done}
+        tasks = []
+        for size, density, tool_size in itertools.product(args.sizes, args.densities, args.tool_sizes):
+            width, height = (int(v) for v in size.lower().split("x"))
+            key = config_key(width, height, density, tool_size)
+            for n in range(args.games):
+                seed = args.seed + n
+                if (key, seed) not in finished:
+                    tasks.append((width, height, density, tool_size, seed))
+        print(f"待完成 {len(tasks)} 局（已完成 {len(done)} 局），使用 {args.workers} 个进程")
+        try:
+            with open(args.output, "a", encoding="utf-8") as out, Pool(args.workers) as pool:
+                for i, result in enumerate(pool.imap_unordered(_play_task, tasks, chunksize=16), 1):
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    done.append(result)
+                    if i % 100 == 0:
+                        out.flush()
+                        print(f"\r进度: {i}/{len(tasks)}", end="", flush=True)
+            print()
+        except KeyboardInterrupt:
+            print("\n已中断，已完成的对局已保存，重新运行即可继续")
+    print_summary(summarize(done))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
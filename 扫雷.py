@@ -1,15 +1,23 @@
+import time
+_IMPORT_START = time.perf_counter()  # 用于启动耗时统计，必须在其他导入之前
 import pygame
-import random
 import os
 import sys
+import math
 import pickle
-import time
-import subprocess
 import traceback
 import datetime
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pygame.locals import *
-from tkinter import Tk
-from tkinter.filedialog import askopenfilename
+from minesweeper_engine import MinesweeperEngine, normalize_seed
+from minesweeper_save import save_state, load_state
+from minesweeper_history import DEFAULT_HISTORY_LIMIT
+from minesweeper_telemetry import TelemetryBuffer
+from minesweeper_replay import (ReplayRecorder, ACTION_REVEAL, ACTION_FLAG, ACTION_CHORD, ACTION_TOOL,
+                                ACTION_UNDO, ACTION_REDO, ACTION_NAMES)
 
 # 资源路径处理函数（支持PyInstaller打包）
 def get_resource_path(relative_path):
@@ -20,17 +28,85 @@ def get_resource_path(relative_path):
         base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, relative_path)
 
-def generate_crash_report(exception, filename="crash_report.txt"):
-    """生成崩溃报告，包含异常信息、时间、代码调用栈等"""
-    crash_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+ACTIVE_RECORDER = None  # 当前对局的录像，崩溃时随报告一起保存以便复现
+TELEMETRY = TelemetryBuffer()  # 最近的输入、操作、帧耗时等事件，随报告一起写出
+CRASH_REPORT_LIMIT = 20  # 每次运行最多生成的崩溃报告数（避免每帧重复出错时写出大量文件）
+_crash_reports_written = 0
+
+def generate_crash_report(exception=None, filename=None):
+    """生成带时间戳的崩溃报告，包含异常信息、代码调用栈和最近事件；有当前对局录像时一并保存
+
+    exception 为 None 时生成诊断报告（用于反馈卡顿等没有异常的问题）。返回报告路径。
+    """
+    global _crash_reports_written
+    if exception is not None:
+        if _crash_reports_written >= CRASH_REPORT_LIMIT:
+            print(f"[WARNING] 崩溃报告已达 {CRASH_REPORT_LIMIT} 份，不再生成: {type(exception).__name__}: {exception}")
+            return None
+        _crash_reports_written += 1
+    now = datetime.datetime.now()
+    crash_time = now.strftime("%Y-%m-%d %H:%M:%S")
+    if filename is None:
+        prefix = "crash_report" if exception is not None else "diagnostic_report"
+        filename = now.strftime(f"{prefix}_%Y%m%d_%H%M%S.txt")
+    replay_path = None
+    if ACTIVE_RECORDER is not None and len(ACTIVE_RECORDER):
+        replay_path = os.path.splitext(filename)[0] + ".replay"
+        try:
+            ACTIVE_RECORDER.save(replay_path)
+        except Exception as e:
+            print(f"[ERROR] 保存崩溃录像失败: {e}")
+            replay_path = None
     with open(filename, "w", encoding="utf-8") as f:
-        f.write(f"=== 崩溃报告 ===\n")
+        f.write("=== 崩溃报告 ===\n" if exception is not None else "=== 诊断报告 ===\n")
         f.write(f"时间: {crash_time}\n")
-        f.write(f"异常类型: {type(exception).__name__}\n")
-        f.write(f"异常信息: {str(exception)}\n\n")
-        f.write(f"代码调用栈:\n")
-        f.write(traceback.format_exc())
-    print(f"崩溃报告已生成: {filename}")
+        f.write(f"环境: Python {sys.version.split()[0]}, pygame {pygame.version.ver}, {sys.platform}\n")
+        if exception is not None:
+            f.write(f"异常类型: {type(exception).__name__}\n")
+            f.write(f"异常信息: {str(exception)}\n")
+        if replay_path:
+            f.write(f"对局录像: {replay_path}（python minesweeper_replay.py {replay_path} 可复现）\n")
+        if exception is not None:
+            f.write("\n代码调用栈:\n")
+            f.write(traceback.format_exc())
+        f.write("\n最近事件:\n")
+        for line in TELEMETRY.format_lines():
+            f.write(line + "\n")
+    print(f"{'崩溃' if exception is not None else '诊断'}报告已生成: {filename}")
+    return filename
+
+class StartupTimer:
+    """记录启动各阶段耗时；使用 --startup-timing 参数或设置 MINESWEEPER_STARTUP_TIMING 环境变量时打印报告"""
+    def __init__(self):
+        self.enabled = "--startup-timing" in sys.argv or bool(os.environ.get("MINESWEEPER_STARTUP_TIMING"))
+        self.phases = []
+        self.lock = threading.Lock()
+        self.reported = False
+    
+    def record(self, name, seconds):
+        with self.lock:
+            self.phases.append((name, seconds))
+    
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+    
+    def report(self):
+        """打印各阶段耗时（每次启动只打印一次）"""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        print("=== 启动耗时 ===")
+        with self.lock:
+            for name, seconds in self.phases:
+                print(f"{name:<12} {seconds * 1000:>8.1f} ms")
+        print(f"{'启动至今':<12} {(time.perf_counter() - _IMPORT_START) * 1000:>8.1f} ms")
+
+STARTUP_TIMER = StartupTimer()
 
 # 智能字体创建函数（确保在Pygame初始化后调用）
 def create_font(size):
@@ -60,6 +136,8 @@ TRANSPARENT = (0, 0, 0, 0)
 GRID_LINE = (150, 150, 150, 200)
 UNREVEALED = (180, 180, 180, 200)
 REVEALED = (220, 220, 220, 200)
+SATISFIED = (200, 225, 200, 200)  # 周围旗数已等于数字的格子
+SATISFIED_NUM_COLOR = (110, 130, 110, 255)
 MINECOLOR = (0, 0, 0, 255)
 FLAG = (255, 0, 0, 255)
 TEXT_COLOR = (0, 0, 0, 255)
@@ -84,6 +162,7 @@ TIME_COLOR = (80, 80, 200, 255)
 ERROR_COLOR = (255, 100, 100, 200)
 WARNING_COLOR = (255, 165, 0, 200)
 SIDEBAR_COLOR = (200, 200, 200, 200)
+HINT_COLOR = (150, 220, 150, 200)
 
 # 游戏常量
 MIN_CELL_SIZE = 15
@@ -91,12 +170,31 @@ MAX_CELL_SIZE = 40
 DEFAULT_CELL_SIZE = 25
 BUTTON_WIDTH = 100
 BUTTON_HEIGHT = 30
-SCORE_FILE = "minesweeper_score.dat"
+FRAME_RATE = 60  # 主循环和各个界面的帧率上限
+HINT_BUDGET = 0.1  # 每次提示时求解器可用的时间（秒），没推理完的部分留到下次提示
+MIN_BOARD_SIZE = 10
+MAX_BOARD_SIZE = 1000  # 棋盘宽高上限；超出窗口的部分通过视口滚动查看
+MIN_ZOOM_CELL_SIZE = 8
+MAX_ZOOM_CELL_SIZE = 64
+ZOOM_STEP = 1.25
+SCROLL_CELLS = 3  # 滚轮或方向键每次滚动的格数
+WINDOW_SCREEN_RATIO = 0.9  # 窗口最多占桌面的比例
+SCORE_FILE = "minesweeper_score.dat"  # 旧版总积分文件，首次启动时导入结果库
 SAVE_FILE = "minesweeper_save.dat"
+AUTOSAVE_FILE = "minesweeper_autosave.dat"
+REPLAY_FILE = "minesweeper_last.replay"  # 最近一局的录像，用 minesweeper_replay.py 重放
+AUTOSAVE_INTERVAL = 30  # 自动存档间隔（秒）
 CONFIG_FILE = "minesweeper_config.dat"
 INSTRUCTIONS_FILE = "扫雷游戏说明书.txt"
 FLAG_IMAGE_PATH = "images/flag.png"  # 建议将图片放入images文件夹
 BACKGROUND_IMAGE_PATH = "images/background.png"
+IMAGE_CACHE_SIZE = 8  # 最多缓存的缩放图片数量
+PERF_HISTORY = 600  # 性能浮层保留的帧样本数
+PERF_REFRESH_MS = 250  # 性能浮层文字的刷新间隔（毫秒）
+PERF_PANEL_COLOR = (0, 0, 0, 170)
+TOAST_QUEUE_LIMIT = 5  # 最多排队等待显示的提示数
+IMAGE_READY = pygame.USEREVENT + 1  # 后台平滑缩放完成事件
+ASSETS_READY = pygame.USEREVENT + 2  # 后台资源预加载完成事件
 DEFAULT_SOUNDS = {
     "click": "sounds/click.wav",
     "reveal": "sounds/reveal.wav",
@@ -106,6 +204,118 @@ DEFAULT_SOUNDS = {
     "tool": "sounds/tool.wav"
 }
 
+# 音效分类及每类预留的声道数：同类音效只在自己的声道上播放，总发声数不超过各类之和
+SOUND_CATEGORIES = {
+    "click": "ui",
+    "flag": "ui",
+    "tool": "ui",
+    "reveal": "board",
+    "win": "result",
+    "lose": "result",
+}
+SOUND_CHANNELS = {"ui": 2, "board": 2, "result": 1}
+# 连锁揭示音量：1格为最小音量，达到该格数后为最大音量（与棋盘大小无关）
+CASCADE_VOLUME_CELLS = 64
+MIN_SOUND_VOLUME = 0.4
+
+def open_results_store():
+    """打开对局结果库（在后台预加载线程中调用，sqlite3 不拖慢启动）"""
+    from minesweeper_stats import ResultsStore, RESULTS_DB
+    return ResultsStore(RESULTS_DB, SCORE_FILE)
+
+class ImageCache:
+    """图片缓存：每个文件只解码一次，缩放结果按 (路径, 尺寸) 缓存并按最近最少使用淘汰
+
+    窗口拖动时先用快速缩放顶上，平滑缩放放到后台线程完成，完成后发送 IMAGE_READY 事件。
+    """
+    def __init__(self, max_scaled=IMAGE_CACHE_SIZE):
+        self.originals = {}
+        self.decoded = {}  # 后台线程预先解码、尚未转换像素格式的图片
+        self.scaled = OrderedDict()
+        self.max_scaled = max_scaled
+        self.latest = {}  # 每个路径最近一次请求的平滑缩放尺寸，过时的后台任务直接跳过
+        self.lock = threading.Lock()
+        self.executor = None
+    
+    @staticmethod
+    def _decode(path):
+        full_path = get_resource_path(path)
+        if not os.path.exists(full_path):
+            return None
+        return pygame.image.load(full_path)
+    
+    def preload(self, paths):
+        """在后台线程中预先解码图片（像素格式转换需要显示模式，留到主线程 load 时完成）"""
+        for path in paths:
+            try:
+                self.decoded[path] = self._decode(path)
+            except Exception as e:
+                print(f"[ERROR] 加载图片 {path} 失败: {e}")
+                self.decoded[path] = None
+    
+    def load(self, path):
+        """解码图片（每个路径只解码一次），文件缺失或损坏时返回 None"""
+        if path not in self.originals:
+            image = None
+            try:
+                if path in self.decoded:
+                    image = self.decoded.pop(path)
+                else:
+                    image = self._decode(path)
+                if image is not None:
+                    image = image.convert_alpha()
+            except Exception as e:
+                print(f"[ERROR] 加载图片 {path} 失败: {e}")
+            self.originals[path] = image
+        return self.originals[path]
+    
+    def _store(self, key, image):
+        with self.lock:
+            self.scaled[key] = image
+            self.scaled.move_to_end(key)
+            while len(self.scaled) > self.max_scaled:
+                self.scaled.popitem(last=False)
+    
+    def get_scaled(self, path, size, smooth=False):
+        """返回缩放到 size 的图片；smooth 时未命中缓存先返回快速缩放结果，平滑版本在后台生成"""
+        size = (max(1, int(size[0])), max(1, int(size[1])))
+        key = (path, size)
+        with self.lock:
+            image = self.scaled.get(key)
+            if image is not None:
+                self.scaled.move_to_end(key)
+                return image
+        original = self.load(path)
+        if original is None:
+            return None
+        quick = pygame.transform.scale(original, size)
+        if not smooth:
+            self._store(key, quick)
+            return quick
+        self.latest[path] = size
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-scale")
+        self.executor.submit(self._smooth_scale, key, original)
+        return quick
+    
+    def _smooth_scale(self, key, original):
+        path, size = key
+        if self.latest.get(path) != size:
+            return  # 窗口尺寸已经又变了
+        try:
+            self._store(key, pygame.transform.smoothscale(original, size))
+            pygame.event.post(pygame.event.Event(IMAGE_READY, path=path, size=size))
+        except Exception as e:
+            print(f"[ERROR] 缩放图片 {path} 失败: {e}")
+    
+    def forget(self, path):
+        """丢弃某个路径的解码和缩放缓存（资源被替换时使用）"""
+        with self.lock:
+            self.originals.pop(path, None)
+            self.decoded.pop(path, None)
+            for key in [k for k in self.scaled if k[0] == path]:
+                del self.scaled[key]
+
 class SoundManager:
     def __init__(self):
         self.sounds = {}
@@ -113,6 +323,9 @@ class SoundManager:
         self.sound_paths = {}
         self.missing_sounds = []
         self.error_occurred = False
+        self.pending = {}  # 本帧请求的音效 -> 累计格子数，每帧合并播放一次
+        self.channels = {}  # 分类 -> 预留声道列表
+        self.channel_started = {}  # 声道 -> 开始播放时间，声道全忙时抢占最早的一个
         
     def load_sounds(self, sound_dir="sounds"):
         """加载音效文件，缺失时记录但不影响游戏"""
@@ -135,14 +348,64 @@ class SoundManager:
             self.enabled = False
             self.error_occurred = True
             print("[INFO] 未找到任何音效文件，已自动禁用音效系统")
+        else:
+            self.setup_channels()
+    
+    def setup_channels(self):
+        """按分类预留声道，并把总声道数限制为预留数之和"""
+        try:
+            if not pygame.mixer.get_init():
+                return
+            total = sum(SOUND_CHANNELS.values())
+            pygame.mixer.set_num_channels(total)
+            pygame.mixer.set_reserved(total)  # 不让 Sound.play() 的自动分配占用这些声道
+            index = 0
+            for category, count in SOUND_CHANNELS.items():
+                self.channels[category] = [pygame.mixer.Channel(index + n) for n in range(count)]
+                index += count
+        except Exception as e:
+            print(f"[ERROR] 初始化声道失败: {e}")
+            self.channels = {}
     
-    def play(self, sound_name):
+    def play(self, sound_name, cells=1):
+        """请求播放音效；同一帧内的重复请求在 flush 时合并为一次，cells 为本次涉及的格子数"""
         if self.enabled and sound_name in self.sounds:
+            self.pending[sound_name] = self.pending.get(sound_name, 0) + max(1, cells)
+    
+    def flush(self):
+        """每帧调用一次：每种请求过的音效只播放一次，揭示音效的音量随本帧累计的格子数增大"""
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, {}
+        if not self.enabled:
+            return
+        for sound_name, cells in pending.items():
+            volume = self.cascade_volume(cells) if SOUND_CATEGORIES.get(sound_name) == "board" else 1.0
             try:
-                self.sounds[sound_name].play()
-            except:
+                self._play_now(sound_name, volume)
+            except Exception:
                 pass
     
+    @staticmethod
+    def cascade_volume(cells):
+        """连锁越大音量越大，超过 CASCADE_VOLUME_CELLS 格后不再增大"""
+        ratio = math.log1p(min(cells, CASCADE_VOLUME_CELLS) - 1) / math.log(CASCADE_VOLUME_CELLS)
+        return MIN_SOUND_VOLUME + (1.0 - MIN_SOUND_VOLUME) * ratio
+    
+    def _play_now(self, sound_name, volume):
+        sound = self.sounds[sound_name]
+        channels = self.channels.get(SOUND_CATEGORIES.get(sound_name, "ui"))
+        if not channels:
+            sound.set_volume(volume)
+            sound.play()
+            return
+        channel = next((c for c in channels if not c.get_busy()), None)
+        if channel is None:
+            channel = min(channels, key=lambda c: self.channel_started.get(c, 0))
+        channel.set_volume(volume)
+        channel.play(sound)
+        self.channel_started[channel] = time.perf_counter()
+    
     def get_missing_sounds(self):
         """返回缺失的音效列表"""
         return self.missing_sounds
@@ -151,23 +414,547 @@ class SoundManager:
         """检查是否有加载错误"""
         return self.error_occurred
 
-class Cell:
+# 格子贴图编号：0-8 为已揭示的数字格，其余为特殊状态
+TILE_HIDDEN = 9
+TILE_FLAGGED = 10
+TILE_MINE = 11
+TILE_HINTED = 12
+TILE_SATISFIED = 13  # 13-20 为周围旗数已满足的数字 1-8
+TILE_COUNT = 21
+
+class TileAtlas:
+    """按单元格大小预渲染的格子贴图（未揭示、旗子、提示、已揭示0-8、地雷、已满足的数字1-8各一张）"""
+    def __init__(self, cell_size, font, flag_image):
+        self.cell_size = cell_size
+        self.tiles = [self._build_tile(code, cell_size, font, flag_image) for code in range(TILE_COUNT)]
+
+    @staticmethod
+    def _build_tile(code, size, font, flag_image):
+        tile = pygame.Surface((size, size), pygame.SRCALPHA)
+        if code in (TILE_HIDDEN, TILE_FLAGGED, TILE_HINTED):
+            tile.fill(HINT_COLOR if code == TILE_HINTED else UNREVEALED)
+            if code == TILE_FLAGGED:
+                if flag_image:
+                    tile.blit(flag_image, flag_image.get_rect(center=(size//2, size//2)))
+                else:
+                    pygame.draw.rect(tile, FLAG, (5, 5, size-10, size-10))
+                    pygame.draw.line(tile, (255, 255, 0), (5, 5), (size//2, size//2), 2)
+                    pygame.draw.line(tile, (255, 255, 0), (size-5, 5), (size//2, size//2), 2)
+        elif code >= TILE_SATISFIED:
+            tile.fill(SATISFIED)
+            num_text = font.render(str(code - TILE_SATISFIED + 1), True, SATISFIED_NUM_COLOR)
+            tile.blit(num_text, (size // 2 - num_text.get_width() // 2, size // 2 - num_text.get_height() // 2))
+        else:
+            tile.fill(REVEALED)
+            if code == TILE_MINE:
+                pygame.draw.circle(tile, MINECOLOR, (size//2, size//2), size // 3)
+            elif code > 0:
+                num_text = font.render(str(code), True, NUM_COLORS[code - 1])
+                tile.blit(num_text, (size // 2 - num_text.get_width() // 2, size // 2 - num_text.get_height() // 2))
+        pygame.draw.rect(tile, GRID_LINE, (0, 0, size, size), 1)
+        return tile
+
+class PerfHUD:
+    """性能浮层：帧率、帧耗时百分位、各阶段耗时和每帧新建的 Surface 数（F3 开关，F4 导出 CSV）
+
+    帧耗时只统计主循环被唤醒后实际工作的时间，不含等待事件的空闲时间。
+    """
+    PHASES = ("events", "check_win", "draw", "flip")
+
+    def __init__(self, history=PERF_HISTORY):
+        self.enabled = False
+        self.samples = deque(maxlen=history)
+        self.current = dict.fromkeys(self.PHASES, 0.0)
+        self.surfaces = 0
+        self.frame_start = time.perf_counter()
+        self.panel = None
+        self.panel_updated = 0.0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.samples.clear()
+        self.panel = None
+
+    def begin_frame(self):
+        self.frame_start = time.perf_counter()
+        for phase in self.PHASES:
+            self.current[phase] = 0.0
+        self.surfaces = 0
+
+    @contextmanager
+    def measure(self, phase):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.current[phase] += time.perf_counter() - start
+
+    def count_surface(self, count=1):
+        """记录本帧新建的 Surface 数"""
+        self.surfaces += count
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        sample = {"time": time.time(), "frame_ms": (time.perf_counter() - self.frame_start) * 1000}
+        for phase in self.PHASES:
+            sample[f"{phase}_ms"] = self.current[phase] * 1000
+        sample["surfaces"] = self.surfaces
+        self.samples.append(sample)
+
+    def stats(self):
+        """返回 (最近1秒帧数, 帧耗时 p50/p95/p99, 各阶段平均耗时, 平均每帧 Surface 数)"""
+        if not self.samples:
+            return 0, (0.0, 0.0, 0.0), dict.fromkeys(self.PHASES, 0.0), 0.0
+        now = time.time()
+        fps = sum(1 for s in self.samples if now - s["time"] <= 1.0)
+        frame_times = sorted(s["frame_ms"] for s in self.samples)
+        n = len(frame_times)
+        percentiles = tuple(frame_times[min(n - 1, int(n * p))] for p in (0.5, 0.95, 0.99))
+        phases = {phase: sum(s[f"{phase}_ms"] for s in self.samples) / n for phase in self.PHASES}
+        surfaces = sum(s["surfaces"] for s in self.samples) / n
+        return fps, percentiles, phases, surfaces
+
+    def get_panel(self, font):
+        """返回浮层图像；文字每 PERF_REFRESH_MS 才重新渲染一次，避免浮层自身成为开销"""
+        now = time.perf_counter()
+        if self.panel is not None and (now - self.panel_updated) * 1000 < PERF_REFRESH_MS:
+            return self.panel
+        fps, (p50, p95, p99), phases, surfaces = self.stats()
+        lines = [
+            f"FPS {fps}  帧 p50 {p50:.2f} p95 {p95:.2f} p99 {p99:.2f} ms",
+            "  ".join(f"{phase} {phases[phase]:.2f}" for phase in self.PHASES),
+            f"Surface/帧 {surfaces:.1f}  样本 {len(self.samples)}",
+        ]
+        texts = [font.render(line, True, (255, 255, 255, 255)) for line in lines]
+        width = max(t.get_width() for t in texts) + 10
+        height = sum(t.get_height() for t in texts) + 10
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill(PERF_PANEL_COLOR)
+        y = 5
+        for text in texts:
+            panel.blit(text, (5, y))
+            y += text.get_height()
+        self.count_surface(len(texts) + 1)
+        self.panel = panel
+        self.panel_updated = now
+        return panel
+
+    def dump_csv(self, path):
+        """把当前保存的帧样本写入 CSV，返回写入的行数"""
+        import csv  # 只在按 F4 导出时用到，按需导入以加快启动
+        fields = ["time", "frame_ms"] + [f"{phase}_ms" for phase in self.PHASES] + ["surfaces"]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.samples)
+        return len(self.samples)
+
+class Viewport:
+    """棋盘视口：窗口中显示棋盘的区域，负责滚动、缩放以及屏幕坐标与格子坐标的换算"""
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.rect = pygame.Rect(0, 0, 0, 0)  # 视口在窗口中的位置
+        self.offset_x = 0  # 视口左上角对应的棋盘像素坐标
+        self.offset_y = 0
+
+    def reset(self, cell_size, rect, board):
+        self.cell_size = cell_size
+        self.offset_x = self.offset_y = 0
+        self.set_rect(rect, board)
+
+    def set_rect(self, rect, board):
+        self.rect = pygame.Rect(rect)
+        self.clamp(board)
+
+    def clamp(self, board):
+        """保证视口不滚出棋盘范围"""
+        max_x = max(0, board.width * self.cell_size - self.rect.width)
+        max_y = max(0, board.height * self.cell_size - self.rect.height)
+        self.offset_x = min(max(0, self.offset_x), max_x)
+        self.offset_y = min(max(0, self.offset_y), max_y)
+
+    def scroll(self, dx, dy, board):
+        """按像素滚动，返回视口是否移动"""
+        old = (self.offset_x, self.offset_y)
+        self.offset_x += dx
+        self.offset_y += dy
+        self.clamp(board)
+        return (self.offset_x, self.offset_y) != old
+
+    def zoom_at(self, pos, cell_size, board):
+        """以屏幕坐标 pos 处的棋盘位置为中心缩放到 cell_size，返回是否改变"""
+        cell_size = min(max(MIN_ZOOM_CELL_SIZE, int(cell_size)), MAX_ZOOM_CELL_SIZE)
+        if cell_size == self.cell_size:
+            return False
+        px = min(max(0, pos[0] - self.rect.x), self.rect.width)
+        py = min(max(0, pos[1] - self.rect.y), self.rect.height)
+        board_x = (self.offset_x + px) / self.cell_size
+        board_y = (self.offset_y + py) / self.cell_size
+        self.cell_size = cell_size
+        self.offset_x = int(board_x * cell_size - px)
+        self.offset_y = int(board_y * cell_size - py)
+        self.clamp(board)
+        return True
+
+    def origin(self):
+        """棋盘 (0, 0) 格左上角在窗口中的坐标（可能在视口之外）"""
+        return (self.rect.x - self.offset_x, self.rect.y - self.offset_y)
+
+    def visible_cells(self, board):
+        """视口内可见的格子范围 (x0, y0, x1, y1)，右下边界不含"""
+        size = self.cell_size
+        x0 = self.offset_x // size
+        y0 = self.offset_y // size
+        x1 = min(board.width, (self.offset_x + self.rect.width + size - 1) // size)
+        y1 = min(board.height, (self.offset_y + self.rect.height + size - 1) // size)
+        return x0, y0, x1, y1
+
+    def cells_in_rect(self, rect, board):
+        """与屏幕矩形重叠的可见格子 (x, y) 列表"""
+        size = self.cell_size
+        ox, oy = self.origin()
+        vx0, vy0, vx1, vy1 = self.visible_cells(board)
+        x0 = max(vx0, (rect.left - ox) // size)
+        y0 = max(vy0, (rect.top - oy) // size)
+        x1 = min(vx1, (rect.right - 1 - ox) // size + 1)
+        y1 = min(vy1, (rect.bottom - 1 - oy) // size + 1)
+        return [(x, y) for y in range(y0, y1) for x in range(x0, x1)]
+
+    def cell_at(self, pos, board):
+        """屏幕坐标对应的格子 (x, y)，不在棋盘上时返回 None"""
+        if not self.rect.collidepoint(pos):
+            return None
+        x = (pos[0] - self.rect.x + self.offset_x) // self.cell_size
+        y = (pos[1] - self.rect.y + self.offset_y) // self.cell_size
+        return (x, y) if board.in_bounds(x, y) else None
+
+class BoardRenderer:
+    """棋盘脏矩形渲染器：整帧重绘只在布局变化时发生，平时只重绘状态改变的单元格
+
+    只绘制视口内可见的格子，渲染开销取决于窗口大小而不是棋盘大小。
+    """
     def __init__(self):
-        self.is_mine = False
-        self.is_revealed = False
-        self.is_flagged = False
-        self.neighbor_mines = 0
-        self.is_hinted = False
-
-class Minesweeper:
-    def __init__(self, width=30, height=20, mine_percentage=0.15, cell_size=DEFAULT_CELL_SIZE, resizable=True):
+        self.atlas = None
+        self.atlas_key = None
+        self.dirty = set()
+        self.full_redraw = True
+
+    @staticmethod
+    def tile_code(board, i):
+        """单元格当前状态对应的贴图编号"""
+        if board.revealed[i]:
+            if board.mines[i]:
+                return TILE_MINE
+            count = board.counts[i]
+            if count and board.flag_counts[i] == count:
+                return TILE_SATISFIED + count - 1
+            return count
+        if board.flagged[i]:
+            return TILE_FLAGGED
+        return TILE_HINTED if board.hinted[i] else TILE_HIDDEN
+
+    def ensure_atlas(self, cell_size, font, flag_image):
+        """单元格大小或旗子图标变化时重建贴图集，返回是否重建"""
+        key = (cell_size, id(flag_image))
+        if key != self.atlas_key:
+            self.atlas = TileAtlas(cell_size, font, flag_image)
+            self.atlas_key = key
+            self.invalidate()
+            return True
+        return False
+
+    def invalidate(self):
+        """要求下一帧整体重绘"""
+        self.full_redraw = True
+        self.dirty.clear()
+
+    def mark_dirty(self, cells):
+        """记录状态改变的单元格 (x, y)"""
+        if not self.full_redraw:
+            self.dirty.update(cells)
+
+    def mark_dirty_indices(self, indices, board, viewport, neighbors=False):
+        """记录状态改变的格子下标（neighbors 时连同八邻域）；只换算视口内的格子，改变过多时直接整帧重绘"""
+        if self.full_redraw:
+            return
+        x0, y0, x1, y1 = viewport.visible_cells(board)
+        if len(indices) > (x1 - x0) * (y1 - y0) // 4:
+            self.invalidate()
+            return
+        width = board.width
+        dirty = self.dirty
+        for i in indices:
+            y, x = divmod(i, width)
+            for cx, cy in (board.area(x, y) if neighbors else ((x, y),)):
+                if x0 <= cx < x1 and y0 <= cy < y1:
+                    dirty.add((cx, cy))
+
+    def needs_full_redraw(self, board, viewport):
+        # 改变的格子过多时，逐格更新反而比整帧重绘慢
+        if self.full_redraw:
+            return True
+        x0, y0, x1, y1 = viewport.visible_cells(board)
+        return len(self.dirty) > (x1 - x0) * (y1 - y0) // 4
+
+    def draw_all(self, screen, board, viewport):
+        """绘制视口内可见的单元格"""
+        tiles = self.atlas.tiles
+        size = self.atlas.cell_size
+        ox, oy = viewport.origin()
+        x0, y0, x1, y1 = viewport.visible_cells(board)
+        tile_code = self.tile_code
+        width = board.width
+        screen.set_clip(viewport.rect)
+        screen.blits([(tiles[tile_code(board, y * width + x)], (ox + x * size, oy + y * size))
+                      for y in range(y0, y1) for x in range(x0, x1)], doreturn=False)
+        screen.set_clip(None)
+        self.dirty.clear()
+        self.full_redraw = False
+
+    def draw_dirty(self, screen, board, viewport, background):
+        """只重绘视口内改变的单元格（先还原其下方背景），返回需要提交到屏幕的矩形列表"""
+        tiles = self.atlas.tiles
+        size = self.atlas.cell_size
+        ox, oy = viewport.origin()
+        x0, y0, x1, y1 = viewport.visible_cells(board)
+        rects = []
+        screen.set_clip(viewport.rect)
+        for x, y in self.dirty:
+            if not (x0 <= x < x1 and y0 <= y < y1):
+                continue
+            rect = pygame.Rect(ox + x * size, oy + y * size, size, size)
+            if background:
+                screen.blit(background, rect.topleft, rect)
+            else:
+                screen.fill(TRANSPARENT, rect)
+            screen.blit(tiles[self.tile_code(board, board.index(x, y))], rect.topleft)
+            rects.append(rect.clip(viewport.rect))
+        screen.set_clip(None)
+        self.dirty.clear()
+        return rects
+
+class ToastQueue:
+    """非阻塞提示队列：消息依次显示为定时浮层，由所在界面的帧循环绘制，期间照常响应输入"""
+    def __init__(self, limit=TOAST_QUEUE_LIMIT):
+        self.queue = deque(maxlen=limit)  # 等待显示的 (消息, 毫秒, 底色)
+        self.current = None  # 正在显示的 [消息, 底色, 结束时刻]
+        self._surface = None
+        self._surface_key = None
+
+    def push(self, message, duration=1500, color=ERROR_COLOR):
+        """排队一条消息；与正在显示的消息相同时只延长显示时间，不重复排队"""
+        if self.current and self.current[0] == message and not self.queue:
+            self.current[2] = max(self.current[2], pygame.time.get_ticks() + duration)
+        elif not self.queue or self.queue[-1][0] != message:
+            self.queue.append((message, duration, color))
+
+    def update(self):
+        """到期的消息出队、下一条开始显示；返回显示内容是否改变"""
+        now = pygame.time.get_ticks()
+        changed = False
+        if self.current and now >= self.current[2]:
+            self.current = None
+            changed = True
+        if self.current is None and self.queue:
+            message, duration, color = self.queue.popleft()
+            self.current = [message, color, now + duration]
+            changed = True
+        return changed
+
+    def next_timeout(self):
+        """距当前消息到期的毫秒数；没有消息时返回 None"""
+        if self.current is None:
+            return None
+        return max(1, self.current[2] - pygame.time.get_ticks())
+
+    def rect(self, screen):
+        width, height = screen.get_size()
+        return pygame.Rect(0, height//2 - 20, width, 40)
+
+    def draw(self, screen, font):
+        """把当前消息画到屏幕中间，返回其区域；没有消息时返回 None"""
+        if self.current is None:
+            return None
+        rect = self.rect(screen)
+        message, color, _ = self.current
+        key = (message, color, rect.size)
+        if key != self._surface_key:
+            surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+            surface.fill(color)
+            text = font.render(message, True, (255, 255, 255, 255))
+            surface.blit(text, (rect.width//2 - text.get_width()//2, 10))
+            self._surface, self._surface_key = surface, key
+        screen.blit(self._surface, rect.topleft)
+        return rect
+
+class Widget:
+    """保留模式控件：渲染结果缓存到文字或焦点等状态改变为止"""
+    def __init__(self, rect):
+        self.rect = pygame.Rect(rect)
+        self._surface = None
+        self.drawn_rect = None  # 上次画到屏幕上的区域
+
+    def invalidate(self):
+        self._surface = None
+
+    def is_dirty(self):
+        return self._surface is None
+
+    def render(self):
+        raise NotImplementedError
+
+    def get_surface(self):
+        if self._surface is None:
+            self._surface = self.render()
+        return self._surface
+
+class Label(Widget):
+    """单行文字；anchor 指定 pos 对齐到文字矩形的哪个点（如 topleft、midtop、topright）"""
+    def __init__(self, pos, text, font, color, anchor="topleft"):
+        super().__init__((pos, (0, 0)))
+        self.pos = pos
+        self.font = font
+        self.color = color
+        self.anchor = anchor
+        self.text = None
+        self.set_text(text)
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.invalidate()
+
+    def render(self):
+        surface = self.font.render(self.text, True, self.color)
+        self.rect.size = surface.get_size()
+        setattr(self.rect, self.anchor, self.pos)
+        return surface
+
+class TextInput(Widget):
+    """只接受数字的输入框"""
+    def __init__(self, rect, text, font):
+        super().__init__(rect)
+        self.font = font
+        self.text = text
+        self.focused = False
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.invalidate()
+
+    def set_focus(self, focused):
+        if focused != self.focused:
+            self.focused = focused
+            self.invalidate()
+
+    def handle_key(self, event):
+        if event.key == K_BACKSPACE:
+            self.set_text(self.text[:-1])
+        elif event.unicode.isdigit():
+            self.set_text(self.text + event.unicode)
+
+    def render(self):
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        surface.fill((200, 220, 255, 255) if self.focused else INPUT_BG)
+        pygame.draw.rect(surface, (0, 0, 0, 255), surface.get_rect(), 2, border_radius=5)
+        surface.blit(self.font.render(self.text, True, (0, 0, 0, 255)), (10, 5))
+        return surface
+
+class Button(Widget):
+    """带文字的按钮"""
+    def __init__(self, rect, text, font, color, text_color=(255, 255, 255, 255)):
+        super().__init__(rect)
+        self.text = text
+        self.font = font
+        self.color = color
+        self.text_color = text_color
+
+    def render(self):
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        surface.fill(self.color)
+        pygame.draw.rect(surface, (0, 0, 0, 255), surface.get_rect(), 2, border_radius=5)
+        text = self.font.render(self.text, True, self.text_color)
+        surface.blit(text, (self.rect.width//2 - text.get_width()//2, self.rect.height//2 - text.get_height()//2))
+        return surface
+
+class WidgetScreen:
+    """由控件组成的界面：背景（进入时的画面加半透明底色）只合成一次，之后只重绘状态改变的控件"""
+    def __init__(self, screen, color, panel_rect=None, toasts=None, font=None):
+        self.screen = screen
+        self.toasts = toasts
+        self.font = font
+        self.background = screen.copy()
+        panel_rect = pygame.Rect(panel_rect) if panel_rect else self.background.get_rect()
+        overlay = pygame.Surface(panel_rect.size, pygame.SRCALPHA)
+        overlay.fill(color)
+        self.background.blit(overlay, panel_rect.topleft)
+        self.widgets = []
+        self.full_redraw = True
+
+    def add(self, widget):
+        self.widgets.append(widget)
+        return widget
+
+    def invalidate(self):
+        """下一次 draw 时整屏重绘（例如窗口重新露出或被其他内容覆盖后）"""
+        self.full_redraw = True
+
+    def draw(self):
+        """把改变的部分画到屏幕上并提交；什么都没变时不做任何事"""
+        if self.toasts and self.toasts.update():
+            self.full_redraw = True  # 提示出现或消失
+        if self.toasts and self.toasts.current and not self.full_redraw:
+            # 提示浮层是半透明的，被重绘的控件盖住时整屏重绘，避免浮层反复叠加
+            toast_rect = self.toasts.rect(self.screen)
+            self.full_redraw = any(widget.is_dirty() and toast_rect.colliderect(widget.drawn_rect or widget.rect)
+                                   for widget in self.widgets)
+        if self.full_redraw:
+            self.screen.blit(self.background, (0, 0))
+            for widget in self.widgets:
+                surface = widget.get_surface()
+                self.screen.blit(surface, widget.rect)
+                widget.drawn_rect = widget.rect.copy()
+            if self.toasts:
+                self.toasts.draw(self.screen, self.font)
+            pygame.display.flip()
+            self.full_redraw = False
+            return
+        rects = []
+        for widget in self.widgets:
+            if not widget.is_dirty():
+                continue
+            surface = widget.get_surface()
+            area = widget.rect.union(widget.drawn_rect) if widget.drawn_rect else widget.rect.copy()
+            self.screen.blit(self.background, area, area)
+            self.screen.blit(surface, widget.rect)
+            widget.drawn_rect = widget.rect.copy()
+            rects.append(area)
+        if rects:
+            pygame.display.update(rects)
+
+class Minesweeper(MinesweeperEngine):
+    """扫雷游戏界面：在规则引擎之上负责窗口、渲染、音效、存档和配置"""
+    def __init__(self, width=30, height=20, mine_percentage=0.15, cell_size=DEFAULT_CELL_SIZE, resizable=True, seed=None,
+                 spectating=False):
         try:
             # 初始化Pygame核心模块（确保在创建字体前调用）
+            display_start = time.perf_counter()
             if not pygame.get_init():
                 pygame.init()  # 初始化Pygame核心
             if not pygame.font.get_init():
                 pygame.font.init()  # 单独初始化字体模块（关键修复）
             
+            show_time = True
+            sound_enabled = True
+            tool_size = 3
+            history_limit = DEFAULT_HISTORY_LIMIT
+            no_guess = False
+            
             # 尝试加载配置
             config = self.load_config()
             if config:
@@ -178,6 +965,12 @@ class Minesweeper:
                 show_time = config.get('show_time', True)
                 sound_enabled = config.get('sound_enabled', True)
                 tool_size = config.get('tool_size', 3)
+                history_limit = config.get('history_limit', DEFAULT_HISTORY_LIMIT)
+                no_guess = config.get('no_guess', False)
+            # 观看录像时为 True：不写入结果库、总积分和自动存档，也不启动无猜棋盘的后台生成
+            self.spectating = spectating
+            if spectating:
+                no_guess = False
             
             self.original_width = width
             self.original_height = height
@@ -186,68 +979,145 @@ class Minesweeper:
             self.original_show_time = show_time
             self.original_sound_enabled = sound_enabled
             self.original_tool_size = tool_size
+            self.original_seed = normalize_seed(seed)
+            self.original_no_guess = no_guess
+            self.no_guess = no_guess
+            self.board_pool = None  # 首次需要无猜棋盘时才启动后台生成
+            self.start_cell = None
 
-            self.width = min(max(10, width), 100)
-            self.height = min(max(10, height), 60)
+            width = min(max(MIN_BOARD_SIZE, width), MAX_BOARD_SIZE)
+            height = min(max(MIN_BOARD_SIZE, height), MAX_BOARD_SIZE)
+            super().__init__(width, height, mine_percentage, tool_size, seed, history_limit)
             self.cell_size = cell_size
-            self.mine_percentage = mine_percentage
+            self.viewport = Viewport(cell_size)
             self.resizable = resizable
-            self.total_mines = int(self.width * self.height * mine_percentage)
-            self.score = 0  # 单局积分
-            self.total_score = self.load_score()  # 总积分
-            self.game_over = False
-            self.win = False
-            self.first_click = True
+            self.results = None  # 结果库在后台打开，处理第一个输入前由 attach_results 接入
+            self.results_attached = False
+            self.start_recording()
             self.tool_active = False
-            self.tool_cost = 1000  # 道具成本固定为1000分
-            self.show_time = show_time if 'show_time' in locals() else True
-            self.start_time = time.time()
-            self.game_time = 0
-            self.tool_size = tool_size if 'tool_size' in locals() else 3
+            self.show_time = show_time
             
             # 初始化字体（此时Pygame已初始化，避免报错）
-            self.FONT = create_font(18)
-            self.TITLE_FONT = create_font(24)
-            self.SCORE_FONT = create_font(16)
+            display_time = time.perf_counter() - display_start
+            with STARTUP_TIMER.measure("字体"):
+                self.FONT = create_font(18)
+                self.TITLE_FONT = create_font(24)
+                self.SCORE_FONT = create_font(16)
             
             # 初始化声音管理器
             self.sound_manager = SoundManager()
-            self.sound_manager.enabled = sound_enabled if 'sound_enabled' in locals() else True
+            self.sound_manager.enabled = sound_enabled
             
             self.calculate_window_size()
+            display_start = time.perf_counter()
             flags = pygame.RESIZABLE if self.resizable else 0
             self.screen = pygame.display.set_mode((self.window_width, self.window_height), flags)
             pygame.display.set_caption("扫雷游戏")
+            STARTUP_TIMER.record("显示初始化", display_time + time.perf_counter() - display_start)
             
-            self.board = [[Cell() for _ in range(self.width)] for _ in range(self.height)]
+            self.renderer = BoardRenderer()
+            self.perf = PerfHUD()
+            self.toasts = ToastQueue()
+            self.image_cache = ImageCache()
+            self._text_cache = {}
+            self._button_cache = {}
             self.buttons = []
             self.create_buttons()
             
-            # 加载旗子图片
-            self.flag_image = self.load_flag_image()
-            
-            # 加载背景图片
-            self.background_image = self.load_background_image()
-            
-            # 加载声音
-            self.sound_manager.load_sounds()
-            
-            # 显示缺失资源警告
-            self.display_resource_warnings()
+            # 图片和音效在后台加载，首帧先用默认绘制，加载完成后收到 ASSETS_READY 再替换
+            self.flag_image = None
+            self.background_image = None
+            self.assets_ready = False
+            self.start_asset_preload()
             
-            self.place_mines_after_first_click = True
+            self.unsaved_changes = False
+            self.last_autosave = time.time()
+            self.window_minimized = False
+            self.window_focused = True
+            self.expose_pending = False
             self.last_click_time = 0
             self.last_click_pos = None
         except Exception as e:
             generate_crash_report(e)
             raise
     
+    def quit_game(self):
+        """保存结果、停止后台生成并退出；正常退出时不保留用于崩溃恢复的自动存档"""
+        self.discard_autosave()
+        self.attach_results()
+        if self.results is not None:
+            self.results.close()
+        if self.board_pool is not None:
+            self.board_pool.close()
+        pygame.quit()
+        sys.exit()
+    
+    def start_asset_preload(self):
+        """在后台线程中并行解码图片、加载音效、打开结果库，全部完成后发送 ASSETS_READY 事件"""
+        executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="asset-load")
+        jobs = [
+            ("图片", lambda: self.image_cache.preload([FLAG_IMAGE_PATH, BACKGROUND_IMAGE_PATH])),
+            ("音效", self.sound_manager.load_sounds),
+            ("结果库", open_results_store),
+        ]
+        remaining = [len(jobs)]
+        lock = threading.Lock()
+        
+        def run_job(name, job):
+            start = time.perf_counter()
+            result = None
+            try:
+                with STARTUP_TIMER.measure(name):
+                    result = job()
+                TELEMETRY.record("asset", (name, "ok", (time.perf_counter() - start) * 1000))
+            except Exception as e:
+                TELEMETRY.record("asset", (name, f"失败: {e}", (time.perf_counter() - start) * 1000))
+                print(f"[ERROR] 后台加载{name}失败: {e}")
+            with lock:
+                remaining[0] -= 1
+                if remaining[0] == 0:
+                    pygame.event.post(pygame.event.Event(ASSETS_READY))
+            return result
+        
+        futures = [executor.submit(run_job, name, job) for name, job in jobs]
+        self.results_future = futures[-1]
+        executor.shutdown(wait=False)
+    
+    def attach_results(self):
+        """接入后台打开的结果库并读入总积分（必要时等待）
+
+        在处理第一个输入事件、读档和写入结果之前调用；此前总积分只用于显示，不会被修改。
+        """
+        if self.results_attached:
+            return
+        self.results_attached = True
+        self.results = self.results_future.result()
+        if self.results is not None and not self.spectating:
+            self.total_score = self.load_score()
+            if self.recorder is not None:
+                self.recorder.total_score = self.total_score
+            self.renderer.invalidate()
+    
+    def finish_asset_loading(self):
+        """后台资源就绪后在主线程完成图片转换，刷新画面并提示缺失的资源"""
+        self.assets_ready = True
+        self.attach_results()
+        self.flag_image = self.load_flag_image()
+        self.background_image = self.load_background_image()
+        if self.flag_image is None:
+            TELEMETRY.record("asset", ("旗子图标缺失", FLAG_IMAGE_PATH))
+        for name, path in self.sound_manager.get_missing_sounds():
+            TELEMETRY.record("asset", ("音效缺失", name, path))
+        self.renderer.invalidate()
+        STARTUP_TIMER.report()
+        self.display_resource_warnings()
+    
     def calculate_window_size(self):
         """计算窗口大小，动态调整标题栏高度"""
         effective_cell_size = self.cell_size
         # 动态计算标题栏高度（确保能容纳所有显示内容）
         title_height = self.TITLE_FONT.size("扫雷游戏")[1]
-        score_height = self.FONT.size(f"单局积分: 0  总积分: 0")[1]
+        score_height = self.FONT.size("单局积分: 0  总积分: 0")[1]
         time_height = self.FONT.size("时间: 00:00")[1]
         button_height = BUTTON_HEIGHT + 10  # 按钮高度+间距
         
@@ -255,9 +1125,43 @@ class Minesweeper:
         global HEADER_HEIGHT
         HEADER_HEIGHT = self.header_height
         
-        self.window_width = self.width * effective_cell_size + 20  # 预留边界
-        self.window_height = self.height * effective_cell_size + self.header_height + 20
+        # 窗口不超过桌面大小，更大的棋盘通过视口滚动查看
+        max_width, max_height = self.max_window_size()
+        self.window_width = min(self.width * effective_cell_size + 20, max_width)  # 预留边界
+        self.window_height = min(self.height * effective_cell_size + self.header_height + 20, max_height)
         self.effective_cell_size = effective_cell_size
+        self.viewport.reset(effective_cell_size, self.viewport_rect(), self.board)
+        TELEMETRY.record("window", (self.window_width, self.window_height, effective_cell_size))
+    
+    @staticmethod
+    def max_window_size():
+        """窗口的最大尺寸（桌面大小的一定比例），无法获取桌面大小时不限制"""
+        try:
+            desktop_width, desktop_height = pygame.display.get_desktop_sizes()[0]
+            return int(desktop_width * WINDOW_SCREEN_RATIO), int(desktop_height * WINDOW_SCREEN_RATIO)
+        except Exception:
+            return sys.maxsize, sys.maxsize
+    
+    def viewport_rect(self):
+        """棋盘视口在窗口中的区域（右侧为侧边栏，底部留出边界）"""
+        return pygame.Rect(0, self.header_height, max(0, self.window_width - 20),
+                           max(0, self.window_height - self.header_height - 20))
+    
+    def zoom(self, pos, factor):
+        """以屏幕坐标 pos 为中心缩放棋盘"""
+        target = self.viewport.cell_size * factor
+        if factor > 1:
+            target = max(target, self.viewport.cell_size + 1)
+        if self.viewport.zoom_at(pos, target, self.board):
+            self.effective_cell_size = self.viewport.cell_size
+            self.flag_image = self.load_flag_image()
+            self.renderer.invalidate()
+    
+    def scroll(self, cells_x, cells_y):
+        """按格数滚动视口"""
+        size = self.viewport.cell_size
+        if self.viewport.scroll(cells_x * size, cells_y * size, self.board):
+            self.renderer.invalidate()
     
     def create_buttons(self):
         """创建界面按钮，确保在标题栏内"""
@@ -277,49 +1181,61 @@ class Minesweeper:
     def load_flag_image(self, size=None):
         """加载旗子图标"""
         if size is None:
-            size = (int(self.cell_size * 0.8), int(self.cell_size * 0.8))
+            size = (int(self.effective_cell_size * 0.8), int(self.effective_cell_size * 0.8))
         
         try:
-            flag_path = get_resource_path(FLAG_IMAGE_PATH)
-            if not os.path.exists(flag_path):
-                return None
-            flag_img = pygame.image.load(flag_path).convert_alpha()
-            return pygame.transform.scale(flag_img, size)
+            return self.image_cache.get_scaled(FLAG_IMAGE_PATH, size)
         except:
             return None
     
-    def load_background_image(self):
-        """加载背景图片并根据窗口大小自动填充"""
+    def load_background_image(self, smooth=False):
+        """加载背景图片并根据窗口大小自动填充（解码和缩放结果均有缓存）"""
         try:
-            bg_path = get_resource_path(BACKGROUND_IMAGE_PATH)
-            if os.path.exists(bg_path):
-                bg_img = pygame.image.load(bg_path).convert_alpha()
-                return pygame.transform.scale(bg_img, (self.window_width, self.window_height))
-            return None
+            return self.image_cache.get_scaled(BACKGROUND_IMAGE_PATH, (self.window_width, self.window_height), smooth)
         except:
             return None
     
     def load_score(self):
-        """加载总积分"""
-        if os.path.exists(SCORE_FILE):
-            try:
-                with open(SCORE_FILE, 'rb') as f:
-                    return pickle.load(f)
-            except:
-                return 0
-        return 0
+        """从结果库加载总积分"""
+        try:
+            return self.results.total_score()
+        except Exception as e:
+            print(f"[ERROR] 读取总积分失败: {e}")
+            return 0
     
     def save_score(self):
-        """保存总积分"""
+        """保存总积分（与尚未提交的对局结果在同一事务中写入）"""
+        if self.spectating:
+            return
+        self.attach_results()
+        if self.results is None:
+            return
         try:
-            with open(SCORE_FILE, 'wb') as f:
-                pickle.dump(self.total_score, f)
-        except:
-            pass
+            self.results.set_total_score(self.total_score)
+            self.results.flush()
+        except Exception as e:
+            print(f"[ERROR] 保存总积分失败: {e}")
+    
+    def record_result(self, result):
+        """把结束的一局写入结果库（每局只记录一次，撤销后再次结束不重复记录）"""
+        if self.result_recorded or self.spectating:
+            return
+        self.attach_results()
+        if self.results is None:
+            return
+        self.result_recorded = True
+        TELEMETRY.record("result", (result, self.score, time.time() - self.start_time))
+        try:
+            self.results.record_game(self.width, self.height, self.mine_percentage, self.tool_size, self.seed,
+                                     time.time() - self.start_time, self.score, result, self.clicks)
+        except Exception as e:
+            print(f"[ERROR] 记录对局结果失败: {e}")
     
-    def save_game(self):
-        """保存游戏状态"""
+    def save_game(self, path=SAVE_FILE):
+        """保存游戏状态（二进制存档，原子写入）"""
         try:
+            if not self.first_click and not self.game_over and not self.win:
+                self.game_time = time.time() - self.start_time
             game_state = {
                 'width': self.width,
                 'height': self.height,
@@ -332,34 +1248,97 @@ class Minesweeper:
                 'game_time': self.game_time,
                 'show_time': self.show_time,
                 'cell_size': self.cell_size,
-                'tool_size': self.tool_size
+                'tool_size': self.tool_size,
+                'mine_percentage': self.mine_percentage,
+                'seed': self.seed,
+                'first_click_pos': self.first_click_pos
             }
-            with open(SAVE_FILE, 'wb') as f:
-                pickle.dump(game_state, f)
+            save_state(path, game_state)
+            self.unsaved_changes = False
+            self.last_autosave = time.time()
             return True
         except Exception as e:
             print(f"保存游戏失败: {e}")
             return False
     
-    def load_game(self):
-        """加载游戏存档"""
-        if not os.path.exists(SAVE_FILE):
+    def autosave(self):
+        """自动存档（写入单独的文件，不覆盖手动存档）"""
+        if self.spectating:
             return False
+        return self.save_game(AUTOSAVE_FILE)
+    
+    def discard_autosave(self):
+        """删除自动存档（对局结束、重开或正常退出后不再需要崩溃恢复）；观看录像时不动玩家的自动存档"""
+        self.unsaved_changes = False
+        if self.spectating:
+            return
         try:
-            with open(SAVE_FILE, 'rb') as f:
-                game_state = pickle.load(f)
-            self.width = game_state['width']
-            self.height = game_state['height']
-            self.board = game_state['board']
+            if os.path.exists(AUTOSAVE_FILE):
+                os.remove(AUTOSAVE_FILE)
+        except OSError as e:
+            print(f"[WARNING] 删除自动存档失败: {e}")
+    
+    def offer_recovery(self):
+        """上次游戏未正常退出时（自动存档仍在），询问是否恢复当时的对局"""
+        if self.spectating or not os.path.exists(AUTOSAVE_FILE):
+            return
+        panel_y = self.window_height//2 - 90
+        ui = WidgetScreen(self.screen, WARNING_COLOR, (0, panel_y, self.window_width, 180))
+        ui.add(Label((self.window_width//2, panel_y + 20), "恢复对局", self.TITLE_FONT, (255, 255, 255, 255), anchor="midtop"))
+        ui.add(Label((self.window_width//2, panel_y + 65), "上次游戏未正常退出，是否恢复当时的对局？", self.FONT,
+                     (255, 255, 255, 255), anchor="midtop"))
+        recover_button = ui.add(Button((self.window_width//2 - 110, panel_y + 115, 100, 40), "恢复", self.FONT, (100, 200, 100, 255)))
+        discard_button = ui.add(Button((self.window_width//2 + 10, panel_y + 115, 100, 40), "放弃", self.FONT, (200, 100, 100, 255)))
+        clock = pygame.time.Clock()
+        while True:
+            ui.draw()
+            clock.tick(FRAME_RATE)
+            for event in self.wait_events():
+                if event.type == QUIT:
+                    self.quit_game()
+                if self.handle_background_event(event):
+                    self.draw()  # 弹窗只覆盖中间一条，资源接入后（或资源警告关闭后）先重绘下面的棋盘
+                    ui.invalidate()
+                if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                    ui.invalidate()
+                if event.type == MOUSEBUTTONDOWN:
+                    if recover_button.rect.collidepoint(event.pos):
+                        if self.load_game(AUTOSAVE_FILE):
+                            self.show_message("已恢复上次的对局", 1500)
+                        self.renderer.invalidate()
+                        return
+                    if discard_button.rect.collidepoint(event.pos):
+                        self.discard_autosave()
+                        self.renderer.invalidate()
+                        return
+    
+    def load_game(self, path=SAVE_FILE):
+        """加载游戏存档（默认读取手动存档；自动存档只在启动时用于崩溃恢复）"""
+        if not os.path.exists(path):
+            return False
+        self.attach_results()  # 存档中的总积分优先于结果库中的
+        try:
+            game_state = load_state(path)
+            self.mine_percentage = game_state.get('mine_percentage', self.mine_percentage)
+            self.set_board(game_state['board'])
+            self.finish_recording()
+            self.stop_recording()  # 读档后的局面无法只由种子和操作复现
             self.score = game_state['score']
             self.game_over = game_state['game_over']
             self.win = game_state['win']
             self.first_click = game_state['first_click']
+            # 点击数和结果按读入的这一局重新计算；已结束的存档不再记录结果
+            self.clicks = 0
+            self.result_recorded = self.game_over or self.win
             self.total_score = game_state['total_score']
             self.game_time = game_state['game_time']
             self.show_time = game_state.get('show_time', True)
             self.cell_size = game_state.get('cell_size', DEFAULT_CELL_SIZE)
             self.tool_size = game_state.get('tool_size', 3)
+            self.seed = game_state.get('seed')
+            self.first_click_pos = game_state.get('first_click_pos')
+            self.start_cell = None  # 存档不记录无猜起点，未开局的存档按普通棋盘开局
+            TELEMETRY.record("board", (self.width, self.height, self.mine_percentage, self.seed, f"读档 {path}"))
             self.start_time = time.time() - self.game_time
             self.calculate_window_size()
             flags = pygame.RESIZABLE if self.resizable else 0
@@ -367,6 +1346,10 @@ class Minesweeper:
             self.create_buttons()
             self.background_image = self.load_background_image()
             self.flag_image = self.load_flag_image()
+            self.renderer.invalidate()
+            if path != AUTOSAVE_FILE:
+                self.discard_autosave()  # 自动存档属于被替换的那一局
+            self.unsaved_changes = False
             return True
         except Exception as e:
             print(f"加载游戏失败: {e}")
@@ -392,7 +1375,9 @@ class Minesweeper:
                 'cell_size': self.cell_size,
                 'show_time': self.show_time,
                 'sound_enabled': self.sound_manager.enabled,
-                'tool_size': self.tool_size
+                'tool_size': self.tool_size,
+                'history_limit': self.history_limit,
+                'no_guess': self.no_guess
             }
             with open(CONFIG_FILE, 'wb') as f:
                 pickle.dump(config, f)
@@ -410,16 +1395,19 @@ class Minesweeper:
         self.show_time = self.original_show_time
         self.sound_manager.enabled = self.original_sound_enabled
         self.tool_size = self.original_tool_size
+        self.no_guess = self.original_no_guess
 
-        self.board = [[Cell() for _ in range(self.width)] for _ in range(self.height)]
-        self.score = 0
-        self.game_over = False
-        self.win = False
-        self.first_click = True
+        self.finish_recording()
+        self.discard_autosave()
+        self.new_game(self.original_seed)
+        self.start_recording()
         self.tool_active = False
-        self.place_mines_after_first_click = True
-        self.start_time = time.time()
-        self.game_time = 0
+        if self.no_guess and self.start_cell is None:
+            from minesweeper_noguess import supported
+            if supported(self.width, self.height, self.mine_percentage):
+                self.show_message("无猜棋盘正在后台生成，本局使用普通布雷", 2000)
+            else:
+                self.show_message("当前棋盘超出无猜模式支持的范围，本局使用普通布雷", 2000)
 
         self.calculate_window_size()
         flags = pygame.RESIZABLE if self.resizable else 0
@@ -427,147 +1415,93 @@ class Minesweeper:
         self.create_buttons()
         self.background_image = self.load_background_image()
         self.flag_image = self.load_flag_image()
+        self.renderer.invalidate()
     
-    def place_mines(self, first_x, first_y):
-        """放置地雷（避开首次点击区域）"""
-        self.total_mines = int(self.width * self.height * self.mine_percentage)
-        safe_zone = []
-        for dy in range(-1, 2):
-            for dx in range(-1, 2):
-                ny, nx = first_y + dy, first_x + dx
-                if 0 <= ny < self.height and 0 <= nx < self.width:
-                    safe_zone.append((ny, nx))
-        mines_placed = 0
-        while mines_placed < self.total_mines:
-            y, x = random.randint(0, self.height-1), random.randint(0, self.width-1)
-            if (y, x) not in safe_zone and not self.board[y][x].is_mine:
-                self.board[y][x].is_mine = True
-                mines_placed += 1
-                for dy in range(-1, 2):
-                    for dx in range(-1, 2):
-                        ny, nx = y + dy, x + dx
-                        if 0 <= ny < self.height and 0 <= nx < self.width:
-                            self.board[ny][nx].neighbor_mines += 1
-    
-    def reveal(self, x, y, fast_reveal=False):
-        """揭示单元格"""
-        if not (0 <= y < self.height and 0 <= x < self.width):
-            return
-        cell = self.board[y][x]
-        if cell.is_revealed or cell.is_flagged or self.win:
-            return
-        if self.first_click:
-            self.place_mines(x, y)
-            self.first_click = False
-            self.place_mines_after_first_click = False
-            self.start_time = time.time()
-        cell.is_revealed = True
+    def on_event(self, name, cells=None):
+        """规则事件：播放对应音效并记录需要重绘的单元格"""
+        self.unsaved_changes = True
+        if cells:
+            # 旗数变化会改变邻居数字格的"已满足"显示
+            self.renderer.mark_dirty_indices(cells, self.board, self.viewport, neighbors=name in ("flag", "tool"))
+        if name == "lose":
+            self.renderer.invalidate()
+            self.finish_recording()
+            self.record_result("lose")
+            self.save_score()
+            self.discard_autosave()
+        elif name in ("undo", "redo"):
+            # 撤销可能改变结束状态和邻居的"已满足"显示，整帧重绘（只绘制视口内的格子）
+            self.renderer.invalidate()
+            self.save_score()
         if not self.sound_manager.has_errors():
-            self.sound_manager.play("reveal")
-        if cell.is_mine:
-            self.game_over = True
-            if not self.sound_manager.has_errors():
-                self.sound_manager.play("lose")
-            return
-        if not self.win:
-            self.score += 5 if not fast_reveal else 1
-        if cell.neighbor_mines == 0:
-            for dy in range(-1, 2):
-                for dx in range(-1, 2):
-                    if dx == 0 and dy == 0:
-                        continue
-                    self.reveal(x + dx, y + dy, fast_reveal)
-    
-    def reveal_around(self, x, y):
-        """根据标记数量揭示周围单元格"""
-        cell = self.board[y][x]
-        if not cell.is_revealed or cell.is_mine or cell.neighbor_mines == 0:
-            return
-        flag_count = 0
-        for dy in range(-1, 2):
-            for dx in range(-1, 2):
-                ny, nx = y + dy, x + dx
-                if 0 <= ny < self.height and 0 <= nx < self.width:
-                    if self.board[ny][nx].is_flagged:
-                        flag_count += 1
-        if flag_count == cell.neighbor_mines:
-            for dy in range(-1, 2):
-                for dx in range(-1, 2):
-                    ny, nx = y + dy, x + dx
-                    if 0 <= ny < self.height and 0 <= nx < self.width:
-                        if not self.board[ny][nx].is_flagged:
-                            self.reveal(nx, ny, fast_reveal=True)
-    
-    def toggle_flag(self, x, y):
-        """切换旗帜标记"""
-        if not (0 <= y < self.height and 0 <= x < self.width):
+            self.sound_manager.play(name, len(cells) if cells else 1)
+    
+    def start_recording(self):
+        """开始记录新的一局（录像、点击数和结果）"""
+        global ACTIVE_RECORDER
+        self.clicks = 0
+        self.result_recorded = False
+        self.recorder = ReplayRecorder(self.width, self.height, self.mine_percentage, self.tool_size, self.total_score)
+        ACTIVE_RECORDER = self.recorder
+    
+    def stop_recording(self):
+        global ACTIVE_RECORDER
+        self.recorder = None
+        ACTIVE_RECORDER = None
+    
+    def record(self, action, x, y):
+        TELEMETRY.record("action", (ACTION_NAMES[action], x, y))
+        if self.recorder is not None:
+            self.recorder.record(action, x, y)
+    
+    def finish_recording(self):
+        """把本局录像写入 REPLAY_FILE（没有操作时跳过）"""
+        if self.recorder is None or not len(self.recorder):
             return
-        cell = self.board[y][x]
-        if not cell.is_revealed:
-            cell.is_flagged = not cell.is_flagged
-            if not self.sound_manager.has_errors():
-                self.sound_manager.play("flag")
+        try:
+            self.recorder.save(REPLAY_FILE)
+        except Exception as e:
+            print(f"[ERROR] 保存录像失败: {e}")
+    
+    def new_game(self, seed=None):
+        """开始新的一局；无猜模式下从棋盘池取一个验证过的种子，并把首次点击的起点标为提示"""
+        pooled = None
+        if seed is None and self.no_guess:
+            # 无猜模块会导入 multiprocessing 等，只在启用无猜模式时导入
+            from minesweeper_noguess import BoardPool, supported
+            if supported(self.width, self.height, self.mine_percentage):
+                if self.board_pool is None:
+                    self.board_pool = BoardPool()
+                pooled = self.board_pool.take(self.width, self.height, self.mine_percentage)
+                if pooled is None:
+                    print("[WARNING] 无猜棋盘缓存为空，本局使用普通布雷")
+        super().new_game(pooled if pooled is not None else seed)
+        if pooled is not None:
+            from minesweeper_noguess import start_cell
+            self.start_cell = start_cell(self.width, self.height)
+        else:
+            self.start_cell = None
+        TELEMETRY.record("board", (self.width, self.height, self.mine_percentage, self.seed,
+                                   "无猜" if self.start_cell else "普通"))
+        if self.start_cell is not None:
+            self.board.hinted[self.board.index(*self.start_cell)] = 1
+    
+    def place_mines(self, first_x, first_y, seed=None):
+        super().place_mines(first_x, first_y, seed)
+        if self.recorder is not None:
+            self.recorder.seed = self.seed  # 种子在首次点击时才确定
     
     def use_tool(self, x, y):
         """使用扫雷道具（优先扣除单局积分，不足时扣除总积分）"""
-        cost = self.tool_cost
-        if self.score >= cost:
-            self.score -= cost
-            self.sound_manager.play("tool")
-            self._apply_tool(x, y)
+        if super().use_tool(x, y):
             self.tool_active = True
             return True
-        else:
-            remaining = cost - self.score
-            if self.total_score >= remaining:
-                self.total_score -= remaining
-                self.score = 0
-                self.sound_manager.play("tool")
-                self._apply_tool(x, y)
-                self.tool_active = True
-                return True
-            else:
-                self.show_message(f"积分不足! 需要{cost}分，当前单局: {self.score}，总积分: {self.total_score}", 1500)
-                return False
-    
-    def _apply_tool(self, x, y):
-        """应用道具效果"""
-        start_x = max(0, x - self.tool_size // 2)
-        end_x = min(self.width, x + self.tool_size // 2 + 1)
-        start_y = max(0, y - self.tool_size // 2)
-        end_y = min(self.height, y + self.tool_size // 2 + 1)
-        for y_idx in range(start_y, end_y):
-            for x_idx in range(start_x, end_x):
-                if self.board[y_idx][x_idx].is_mine:
-                    self.board[y_idx][x_idx].is_flagged = True
-    
-    def check_win(self):
-        """检查是否胜利"""
-        for y in range(self.height):
-            for x in range(self.width):
-                cell = self.board[y][x]
-                if not cell.is_mine and not cell.is_revealed:
-                    return False
-        return True
+        self.show_message(f"积分不足! 需要{self.tool_cost}分，当前单局: {self.score}，总积分: {self.total_score}", 1500)
+        return False
     
     def show_message(self, message, duration=1500):
-        """显示提示信息"""
-        try:
-            self.screen.fill(TRANSPARENT)
-            if self.background_image:
-                self.screen.blit(self.background_image, (0, 0))
-            self.draw_game_elements()
-            msg_surface = pygame.Surface((self.window_width, 40), pygame.SRCALPHA)
-            msg_surface.fill(ERROR_COLOR)
-            msg_text = self.FONT.render(message, True, (255, 255, 255, 255))
-            msg_surface.blit(msg_text, (self.window_width//2 - msg_text.get_width()//2, 10))
-            self.screen.blit(msg_surface, (0, self.window_height//2 - 20))
-            pygame.display.flip()
-            pygame.time.delay(duration)
-        except Exception as e:
-            generate_crash_report(e)
-            print(f"显示消息失败: {message}")
-            pygame.time.delay(duration)
+        """显示提示信息：加入提示队列，由帧循环绘制 duration 毫秒，不阻塞输入"""
+        self.toasts.push(message, duration)
     
     def display_resource_warnings(self):
         """显示资源缺失警告"""
@@ -584,29 +1518,28 @@ class Minesweeper:
                 return
                 
             panel_height = 100 + len(warnings) * 30
-            panel = pygame.Surface((self.window_width, panel_height), pygame.SRCALPHA)
-            panel.fill(WARNING_COLOR)
-            title = self.TITLE_FONT.render("资源缺失警告", True, (255, 255, 255, 255))
-            panel.blit(title, (self.window_width//2 - title.get_width()//2, 20))
-            y_offset = 60
+            panel_y = self.window_height//2 - panel_height//2
+            ui = WidgetScreen(self.screen, WARNING_COLOR, (0, panel_y, self.window_width, panel_height))
+            ui.add(Label((self.window_width//2, panel_y + 20), "资源缺失警告", self.TITLE_FONT, (255, 255, 255, 255), anchor="midtop"))
+            y_offset = panel_y + 60
             for warning in warnings:
-                text = self.FONT.render(warning, True, (255, 255, 255, 255))
-                panel.blit(text, (50, y_offset))
+                ui.add(Label((50, y_offset), warning, self.FONT, (255, 255, 255, 255)))
                 y_offset += 30
-            hint = self.FONT.render("点击继续游戏...", True, (255, 255, 255, 255))
-            panel.blit(hint, (self.window_width//2 - hint.get_width()//2, y_offset + 10))
-            
-            self.screen.blit(panel, (0, self.window_height//2 - panel_height//2))
-            pygame.display.flip()
+            ui.add(Label((self.window_width//2, y_offset + 10), "点击继续游戏...", self.FONT, (255, 255, 255, 255), anchor="midtop"))
             
+            clock = pygame.time.Clock()
             waiting = True
             while waiting:
-                for event in pygame.event.get():
+                ui.draw()
+                clock.tick(FRAME_RATE)
+                for event in self.wait_events():
                     if event.type == QUIT:
-                        pygame.quit()
-                        sys.exit()
+                        self.quit_game()
+                    if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED) or self.handle_background_event(event):
+                        ui.invalidate()
                     if event.type == MOUSEBUTTONDOWN or event.type == KEYDOWN:
                         waiting = False
+            self.renderer.invalidate()
         except Exception as e:
             generate_crash_report(e)
             try:
@@ -618,17 +1551,72 @@ class Minesweeper:
             except:
                 print(f"严重错误: 无法显示资源警告 - {e}")
     
-    def draw_game_elements(self):
-        """绘制游戏界面元素"""
-        effective_cell_size = self.effective_cell_size
-        
+    def render_text(self, font, text, color):
+        """渲染文字并缓存结果（界面上的文字大多逐帧不变）"""
+        key = (id(font), text, color)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) > 256:
+                self._text_cache.clear()
+            surface = self._text_cache[key] = font.render(text, True, color)
+            self.perf.count_surface()
+        return surface
+    
+    def get_button_surface(self, btn_type, rect, hovered):
+        """返回预渲染的按钮图像（含底色、边框和文字），按状态缓存"""
+        key = (btn_type, rect.size, hovered, self.tool_active)
+        surface = self._button_cache.get(key)
+        if surface is not None:
+            return surface
+        if btn_type == "tool":
+            text = f"扫雷道具({self.tool_cost}分)"
+            color = TOOL_COLOR
+            hover_color = TOOL_HOVER
+            if self.tool_active:
+                color = (255, 255, 0)
+                hover_color = (255, 255, 100)
+        elif btn_type == "reset":
+            text = "重置游戏"
+            color = BUTTON_COLOR
+            hover_color = BUTTON_HOVER
+        elif btn_type == "save":
+            text = "保存游戏"
+            color = (150, 200, 100, 200)
+            hover_color = (170, 220, 120, 220)
+        elif btn_type == "load":
+            text = "读取存档"
+            color = (200, 150, 100, 200)
+            hover_color = (220, 170, 120, 220)
+        elif btn_type == "config":
+            text = "游戏设置"
+            color = (180, 100, 200, 200)
+            hover_color = (200, 120, 220, 200)
+        elif btn_type == "customize":
+            text = "自定义资源"
+            color = (100, 200, 200, 200)
+            hover_color = (120, 220, 220, 220)
+        elif btn_type == "open_resources":
+            text = "打开资源目录"
+            color = (100, 180, 180, 200)
+            hover_color = (120, 200, 200, 220)
+        surface = pygame.Surface(rect.size, pygame.SRCALPHA)
+        surface.fill(hover_color if hovered else color)
+        pygame.draw.rect(surface, (50, 50, 50, 255), surface.get_rect(), 2, border_radius=5)
+        text_surf = self.FONT.render(text, True, TEXT_COLOR)
+        surface.blit(text_surf, (rect.width//2 - text_surf.get_width()//2, rect.height//2 - text_surf.get_height()//2))
+        self.perf.count_surface(2)
+        self._button_cache[key] = surface
+        return surface
+    
+    def draw_header(self):
+        """绘制标题栏（标题、积分、时间和按钮）"""
         # 绘制标题
-        title = self.TITLE_FONT.render("扫雷游戏", True, TEXT_COLOR)
+        title = self.render_text(self.TITLE_FONT, "扫雷游戏", TEXT_COLOR)
         title_y = 10
         self.screen.blit(title, (self.window_width//2 - title.get_width()//2, title_y))
         
         # 绘制积分显示
-        score_text = self.FONT.render(f"单局积分: {self.score}  总积分: {self.total_score}", True, SCORE_COLOR)
+        score_text = self.render_text(self.FONT, f"单局积分: {self.score}  总积分: {self.total_score}", SCORE_COLOR)
         score_y = title_y + title.get_height() + 10
         self.screen.blit(score_text, (20, score_y))
         
@@ -637,98 +1625,39 @@ class Minesweeper:
             elapsed = int(time.time() - self.start_time)
             minutes = elapsed // 60
             seconds = elapsed % 60
-            time_text = self.FONT.render(f"时间: {minutes:02d}:{seconds:02d}", True, TIME_COLOR)
+            time_text = self.render_text(self.FONT, f"时间: {minutes:02d}:{seconds:02d}", TIME_COLOR)
             time_y = score_y + score_text.get_height() + 10
             self.screen.blit(time_text, (self.window_width - time_text.get_width() - 20, time_y))
         
         # 绘制按钮
+        mouse_pos = pygame.mouse.get_pos()
         for btn_type, rect in self.buttons:
-            if btn_type == "tool":
-                text = f"扫雷道具({self.tool_cost}分)"
-                color = TOOL_COLOR
-                hover_color = TOOL_HOVER
-                if self.tool_active:
-                    color = (255, 255, 0)
-                    hover_color = (255, 255, 100)
-            elif btn_type == "reset":
-                text = "重置游戏"
-                color = BUTTON_COLOR
-                hover_color = BUTTON_HOVER
-            elif btn_type == "save":
-                text = "保存游戏"
-                color = (150, 200, 100, 200)
-                hover_color = (170, 220, 120, 220)
-            elif btn_type == "load":
-                text = "读取存档"
-                color = (200, 150, 100, 200)
-                hover_color = (220, 170, 120, 220)
-            elif btn_type == "config":
-                text = "游戏设置"
-                color = (180, 100, 200, 200)
-                hover_color = (200, 120, 220, 200)
-            elif btn_type == "customize":
-                text = "自定义资源"
-                color = (100, 200, 200, 200)
-                hover_color = (120, 220, 220, 220)
-            elif btn_type == "open_resources":
-                text = "打开资源目录"
-                color = (100, 180, 180, 200)
-                hover_color = (120, 200, 200, 220)
-            button_surface = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-            button_color = hover_color if rect.collidepoint(pygame.mouse.get_pos()) else color
-            button_surface.fill(button_color)
-            self.screen.blit(button_surface, rect.topleft)
-            pygame.draw.rect(self.screen, (50, 50, 50, 255), rect, 2, border_radius=5)
-            text_surf = self.FONT.render(text, True, TEXT_COLOR)
-            self.screen.blit(text_surf, (rect.centerx - text_surf.get_width()//2, rect.centery - text_surf.get_height()//2))
+            self.screen.blit(self.get_button_surface(btn_type, rect, rect.collidepoint(mouse_pos)), rect.topleft)
+    
+    def draw_game_elements(self):
+        """绘制游戏界面元素"""
+        self.draw_header()
         
-        # 绘制棋盘
-        for y in range(self.height):
-            for x in range(self.width):
-                if y >= self.height or x >= self.width:
-                    continue
-                cell = self.board[y][x]
-                draw_x = x * effective_cell_size
-                draw_y = y * effective_cell_size + self.header_height
-                rect = pygame.Rect(draw_x, draw_y, effective_cell_size, effective_cell_size)
-                cell_surface = pygame.Surface((effective_cell_size, effective_cell_size), pygame.SRCALPHA)
-                
-                if cell.is_revealed:
-                    cell_surface.fill(REVEALED)
-                    if cell.is_mine:
-                        pygame.draw.circle(cell_surface, MINECOLOR, (effective_cell_size//2, effective_cell_size//2), effective_cell_size // 3)
-                    elif cell.neighbor_mines > 0:
-                        num_text = self.FONT.render(str(cell.neighbor_mines), True, NUM_COLORS[cell.neighbor_mines - 1])
-                        cell_surface.blit(num_text, (effective_cell_size // 2 - num_text.get_width() // 2, effective_cell_size // 2 - num_text.get_height() // 2))
-                else:
-                    cell_surface.fill(UNREVEALED)
-                    if cell.is_flagged:
-                        if self.flag_image:
-                            img_rect = self.flag_image.get_rect(center=(effective_cell_size//2, effective_cell_size//2))
-                            cell_surface.blit(self.flag_image, img_rect)
-                        else:
-                            pygame.draw.rect(cell_surface, FLAG, (5, 5, effective_cell_size-10, effective_cell_size-10))
-                            pygame.draw.line(cell_surface, (255, 255, 0), (5, 5), (effective_cell_size//2, effective_cell_size//2), 2)
-                            pygame.draw.line(cell_surface, (255, 255, 0), (effective_cell_size-5, 5), (effective_cell_size//2, effective_cell_size//2), 2)
-                pygame.draw.rect(cell_surface, GRID_LINE, (0, 0, effective_cell_size, effective_cell_size), 1)
-                self.screen.blit(cell_surface, rect.topleft)
+        # 绘制棋盘（只绘制视口内可见的部分）
+        self.renderer.draw_all(self.screen, self.board, self.viewport)
         
         if self.game_over or self.win:
-            overlay = pygame.Surface((self.window_width, self.height * effective_cell_size), pygame.SRCALPHA)
+            # 结束提示显示在视口可见区域的中央
+            x0, y0, x1, y1 = self.viewport.visible_cells(self.board)
+            ox, oy = self.viewport.origin()
+            center_x = ox + (x0 + x1) * self.effective_cell_size // 2
+            center_y = oy + (y0 + y1) * self.effective_cell_size // 2
+            self.perf.count_surface(2)
             if self.game_over:
-                overlay.fill((255, 0, 0, 180))
                 game_over_text = self.TITLE_FONT.render("游戏结束!", True, (255, 255, 255, 255))
-                self.screen.blit(game_over_text, (self.window_width//2 - game_over_text.get_width()//2, self.header_height + self.height * effective_cell_size // 2 - game_over_text.get_height()//2))
+                self.screen.blit(game_over_text, (center_x - game_over_text.get_width()//2, center_y - game_over_text.get_height()//2))
                 restart_text = self.FONT.render("点击'重置游戏'按钮重新开始", True, (255, 255, 255, 255))
-                self.screen.blit(restart_text, (self.window_width//2 - restart_text.get_width()//2, self.header_height + self.height * effective_cell_size // 2 + 30))
+                self.screen.blit(restart_text, (center_x - restart_text.get_width()//2, center_y + 30))
             elif self.win:
-                overlay.fill((0, 200, 0, 180))
                 win_text = self.TITLE_FONT.render("恭喜获胜!", True, (255, 255, 255, 255))
-                self.screen.blit(win_text, (self.window_width//2 - win_text.get_width()//2, self.header_height + self.height * effective_cell_size // 2 - win_text.get_height()//2))
-                self.total_score += self.score
-                self.save_score()
+                self.screen.blit(win_text, (center_x - win_text.get_width()//2, center_y - win_text.get_height()//2))
                 score_text = self.FONT.render(f"单局得分: {self.score}  总积分: {self.total_score}", True, (255, 255, 255, 255))
-                self.screen.blit(score_text, (self.window_width//2 - score_text.get_width()//2, self.header_height + self.height * effective_cell_size // 2 + 30))
+                self.screen.blit(score_text, (center_x - score_text.get_width()//2, center_y + 30))
         
         # 绘制侧边栏
         sidebar_width = 20
@@ -739,16 +1668,49 @@ class Minesweeper:
         sidebar_surface = pygame.Surface((sidebar_width, sidebar_height), pygame.SRCALPHA)
         sidebar_surface.fill(SIDEBAR_COLOR)
         self.screen.blit(sidebar_surface, sidebar_rect.topleft)
+        self.perf.count_surface()
     
     def draw(self):
-        """渲染游戏界面"""
+        """渲染游戏界面：布局变化时整帧重绘，否则只更新标题栏和改变的单元格"""
         try:
-            self.screen.fill(TRANSPARENT)
-            if self.background_image:
-                self.background_image = pygame.transform.scale(self.background_image, (self.window_width, self.window_height))
-                self.screen.blit(self.background_image, (0, 0))
-            self.draw_game_elements()
-            pygame.display.flip()
+            renderer = self.renderer
+            perf = self.perf
+            with perf.measure("draw"):
+                if renderer.ensure_atlas(self.effective_cell_size, self.FONT, self.flag_image):
+                    perf.count_surface(TILE_COUNT)
+                # 提示浮层是半透明的，其下方的格子改变时整帧重绘，避免浮层反复叠加
+                full = (renderer.needs_full_redraw(self.board, self.viewport)
+                        or (renderer.dirty and (self.game_over or self.win or self.toasts.current)))
+                if full:
+                    self.screen.fill(TRANSPARENT)
+                    if self.background_image:
+                        self.screen.blit(self.background_image, (0, 0))
+                    self.draw_game_elements()
+                    if perf.enabled:
+                        self.screen.blit(perf.get_panel(self.SCORE_FONT), self.viewport.rect.topleft)
+                    self.toasts.draw(self.screen, self.FONT)
+                else:
+                    header_rect = pygame.Rect(0, 0, self.window_width, self.header_height)
+                    self.screen.fill(TRANSPARENT, header_rect)
+                    if self.background_image:
+                        self.screen.blit(self.background_image, header_rect.topleft, header_rect)
+                    self.draw_header()
+                    panel_rect = None
+                    if perf.enabled:
+                        # 浮层盖在棋盘上：先重绘其下方的格子，再画新的浮层
+                        panel = perf.get_panel(self.SCORE_FONT)
+                        panel_rect = panel.get_rect(topleft=self.viewport.rect.topleft)
+                        renderer.mark_dirty(self.viewport.cells_in_rect(panel_rect, self.board))
+                    rects = renderer.draw_dirty(self.screen, self.board, self.viewport, self.background_image)
+                    rects.append(header_rect)
+                    if panel_rect is not None:
+                        self.screen.blit(panel, panel_rect.topleft)
+                        rects.append(panel_rect)
+            with perf.measure("flip"):
+                if full:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(rects)
         except Exception as e:
             generate_crash_report(e)
             try:
@@ -762,95 +1724,63 @@ class Minesweeper:
     def config_screen(self):
         """游戏配置界面（支持重置配置）"""
         try:
-            config_active = True
-            original_width = self.width
-            original_height = self.height
-            original_mine = self.mine_percentage
-            original_show_time = self.show_time
-            original_sound = self.sound_manager.enabled
-            original_cell_size = self.cell_size
-            original_tool_size = self.tool_size
-            
-            width_input = str(self.width)
-            height_input = str(self.height)
-            mine_input = str(int(self.mine_percentage * 100))
-            show_time = "1" if self.show_time else "0"
-            sound_enabled = "1" if self.sound_manager.enabled and not self.sound_manager.has_errors() else "0"
-            cell_size_input = str(self.cell_size)
-            tool_size_input = str(self.tool_size)
-            
-            input_boxes = [
-                {"rect": pygame.Rect(200, 150, 100, 30), "text": width_input, "label": "宽度 (10-100):", "type": "width"},
-                {"rect": pygame.Rect(200, 200, 100, 30), "text": height_input, "label": "高度 (10-60):", "type": "height"},
-                {"rect": pygame.Rect(200, 250, 100, 30), "text": mine_input, "label": "地雷比例 (%):", "type": "mines"},
-                {"rect": pygame.Rect(200, 300, 100, 30), "text": show_time, "label": "显示时间 (0/1):", "type": "time"},
-                {"rect": pygame.Rect(200, 350, 100, 30), "text": sound_enabled, "label": "音效开关 (0/1):", "type": "sound"},
-                {"rect": pygame.Rect(200, 400, 100, 30), "text": cell_size_input, "label": "单元格大小 (15-40):", "type": "cell_size"},
-                {"rect": pygame.Rect(200, 450, 100, 30), "text": tool_size_input, "label": "道具大小 (3-7):", "type": "tool_size"}
+            ui = WidgetScreen(self.screen, CONFIG_BG, toasts=self.toasts, font=self.FONT)
+            ui.add(Label((self.window_width//2, 50), "游戏配置", self.TITLE_FONT, (50, 50, 120, 255), anchor="midtop"))
+            fields = [
+                (f"宽度 ({MIN_BOARD_SIZE}-{MAX_BOARD_SIZE}):", str(self.width)),
+                (f"高度 ({MIN_BOARD_SIZE}-{MAX_BOARD_SIZE}):", str(self.height)),
+                ("地雷比例 (%):", str(int(self.mine_percentage * 100))),
+                ("显示时间 (0/1):", "1" if self.show_time else "0"),
+                ("音效开关 (0/1):", "1" if self.sound_manager.enabled and not self.sound_manager.has_errors() else "0"),
+                ("单元格大小 (15-40):", str(self.cell_size)),
+                ("道具大小 (3-7):", str(self.tool_size)),
+                ("无猜模式 (0/1):", "1" if self.no_guess else "0"),
             ]
-            
-            save_button = pygame.Rect(150, 500, 100, 40)
-            cancel_button = pygame.Rect(270, 500, 100, 40)
-            reset_button = pygame.Rect(390, 500, 100, 40)
+            input_boxes = []
+            for row, (label, text) in enumerate(fields):
+                rect = pygame.Rect(200, 150 + row * 50, 100, 30)
+                ui.add(Label((rect.x - 20, rect.y + 5), label, self.FONT, (50, 50, 100, 255), anchor="topright"))
+                input_boxes.append(ui.add(TextInput(rect, text, self.FONT)))
+            save_button = ui.add(Button((150, 550, 100, 40), "保存配置", self.FONT, (100, 200, 100, 255)))
+            cancel_button = ui.add(Button((270, 550, 100, 40), "取消", self.FONT, (200, 100, 100, 255)))
+            reset_button = ui.add(Button((390, 550, 100, 40), "重置配置", self.FONT, (200, 200, 100, 255)))
             active_input = None
             clock = pygame.time.Clock()
+            config_active = True
             
             while config_active:
-                config_surface = pygame.Surface((self.window_width, self.window_height), pygame.SRCALPHA)
-                config_surface.fill(CONFIG_BG)
-                
-                title = self.TITLE_FONT.render("游戏配置", True, (50, 50, 120, 255))
-                config_surface.blit(title, (self.window_width//2 - title.get_width()//2, 50))
-                
-                for box in input_boxes:
-                    input_surface = pygame.Surface((box["rect"].width, box["rect"].height), pygame.SRCALPHA)
-                    color = (200, 220, 255, 255) if active_input == box else INPUT_BG
-                    input_surface.fill(color)
-                    pygame.draw.rect(input_surface, (0, 0, 0, 255), (0, 0, box["rect"].width, box["rect"].height), 2, border_radius=5)
-                    label = self.FONT.render(box["label"], True, (50, 50, 100, 255))
-                    config_surface.blit(label, (box["rect"].x - label.get_width() - 20, box["rect"].y + 5))
-                    text_surf = self.FONT.render(box["text"], True, (0, 0, 0, 255))
-                    input_surface.blit(text_surf, (10, 5))
-                    config_surface.blit(input_surface, box["rect"].topleft)
-                
-                # 绘制按钮
-                for btn_rect, text, color in [
-                    (save_button, "保存配置", (100, 200, 100, 255)),
-                    (cancel_button, "取消", (200, 100, 100, 255)),
-                    (reset_button, "重置配置", (200, 200, 100, 255))
-                ]:
-                    btn_surface = pygame.Surface((btn_rect.width, btn_rect.height), pygame.SRCALPHA)
-                    btn_surface.fill(color)
-                    pygame.draw.rect(btn_surface, (0, 0, 0, 255), (0, 0, btn_rect.width, btn_rect.height), 2, border_radius=5)
-                    btn_text = self.FONT.render(text, True, (255, 255, 255, 255))
-                    btn_surface.blit(btn_text, (btn_rect.width//2 - btn_text.get_width()//2, btn_rect.height//2 - btn_text.get_height()//2))
-                    config_surface.blit(btn_surface, btn_rect.topleft)
-                
-                self.screen.blit(config_surface, (0, 0))
-                pygame.display.flip()
-                
-                for event in pygame.event.get():
+                ui.draw()
+                clock.tick(FRAME_RATE)
+                for event in self.wait_events(self.toasts.next_timeout()):
                     if event.type == QUIT:
-                        pygame.quit()
-                        sys.exit()
+                        self.quit_game()
+                    if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED) or self.handle_background_event(event):
+                        ui.invalidate()
                     if event.type == MOUSEBUTTONDOWN:
+                        active_input = None
                         for box in input_boxes:
-                            if box["rect"].collidepoint(event.pos):
+                            box.set_focus(box.rect.collidepoint(event.pos))
+                            if box.focused:
                                 active_input = box
-                            else:
-                                if active_input == box:
-                                    active_input = None
-                        if save_button.collidepoint(event.pos):
+                        if save_button.rect.collidepoint(event.pos):
                             try:
-                                width = int(input_boxes[0]["text"])
-                                height = int(input_boxes[1]["text"])
-                                mine_percentage = int(input_boxes[2]["text"]) / 100
-                                show_time = input_boxes[3]["text"] == "1"
-                                sound_enabled = input_boxes[4]["text"] == "1"
-                                cell_size = int(input_boxes[5]["text"])
-                                tool_size = int(input_boxes[6]["text"])
+                                width = int(input_boxes[0].text)
+                                height = int(input_boxes[1].text)
+                                mine_percentage = int(input_boxes[2].text) / 100
+                                show_time = input_boxes[3].text == "1"
+                                sound_enabled = input_boxes[4].text == "1"
+                                cell_size = int(input_boxes[5].text)
+                                tool_size = int(input_boxes[6].text)
+                                no_guess = input_boxes[7].text == "1"
+                                if no_guess:
+                                    from minesweeper_noguess import MAX_CELLS, MAX_DENSITY, supported
                                 
-                                if 10 <= width <= 100 and 10 <= height <= 60 and 1 <= mine_percentage <= 30 and 15 <= cell_size <= 40 and 3 <= tool_size <= 7:
+                                if no_guess and not supported(width, height, mine_percentage):
+                                    # 更大或更密的棋盘几乎生成不出无猜棋盘，后台进程会一直占满CPU
+                                    self.show_message(f"无猜模式只支持不超过 {MAX_CELLS} 格、"
+                                                      f"地雷比例不超过 {MAX_DENSITY:.0%} 的棋盘", 2500)
+                                elif (MIN_BOARD_SIZE <= width <= MAX_BOARD_SIZE and MIN_BOARD_SIZE <= height <= MAX_BOARD_SIZE
+                                        and 0.01 <= mine_percentage <= 0.3 and 15 <= cell_size <= 40 and 3 <= tool_size <= 7):
                                     self.width = width
                                     self.height = height
                                     self.mine_percentage = mine_percentage
@@ -858,105 +1788,282 @@ class Minesweeper:
                                     self.sound_manager.enabled = sound_enabled
                                     self.cell_size = cell_size
                                     self.tool_size = tool_size
+                                    self.no_guess = no_guess
                                     self.save_config()
+                                    # reset_game 按 original_* 开局，保存后新配置立即生效
+                                    self.original_width, self.original_height = width, height
+                                    self.original_mine_percentage = mine_percentage
+                                    self.original_show_time = show_time
+                                    self.original_sound_enabled = sound_enabled
+                                    self.original_cell_size = cell_size
+                                    self.original_tool_size = tool_size
+                                    self.original_no_guess = no_guess
                                     self.reset_game()
                                     config_active = False
                                 else:
                                     self.show_message("输入值超出范围，请重新输入", 2000)
                             except ValueError:
                                 self.show_message("输入格式错误，请输入有效的数字", 2000)
-                        elif cancel_button.collidepoint(event.pos):
+                        elif cancel_button.rect.collidepoint(event.pos):
                             config_active = False
-                        elif reset_button.collidepoint(event.pos):
-                            input_boxes[0]["text"] = str(self.original_width)
-                            input_boxes[1]["text"] = str(self.original_height)
-                            input_boxes[2]["text"] = str(int(self.original_mine_percentage * 100))
-                            input_boxes[3]["text"] = "1" if self.original_show_time else "0"
-                            input_boxes[4]["text"] = "1" if self.original_sound_enabled and not self.sound_manager.has_errors() else "0"
-                            input_boxes[5]["text"] = str(self.original_cell_size)
-                            input_boxes[6]["text"] = str(self.original_tool_size)
-                    if event.type == KEYDOWN:
-                        if active_input:
-                            if event.key == K_BACKSPACE:
-                                active_input["text"] = active_input["text"][:-1]
-                            elif event.unicode.isdigit():
-                                active_input["text"] += event.unicode
+                        elif reset_button.rect.collidepoint(event.pos):
+                            input_boxes[0].set_text(str(self.original_width))
+                            input_boxes[1].set_text(str(self.original_height))
+                            input_boxes[2].set_text(str(int(self.original_mine_percentage * 100)))
+                            input_boxes[3].set_text("1" if self.original_show_time else "0")
+                            input_boxes[4].set_text("1" if self.original_sound_enabled and not self.sound_manager.has_errors() else "0")
+                            input_boxes[5].set_text(str(self.original_cell_size))
+                            input_boxes[6].set_text(str(self.original_tool_size))
+                            input_boxes[7].set_text("1" if self.original_no_guess else "0")
+                    if event.type == KEYDOWN and active_input:
+                        active_input.handle_key(event)
+            self.renderer.invalidate()
         
         except Exception as e:
             generate_crash_report(e)
             print(f"配置界面出错: {e}")
     
     def customize_resources(self):
+        # tkinter 只在这里用到，按需导入以加快启动
+        from tkinter import Tk
+        from tkinter.filedialog import askopenfilename
         Tk().withdraw()
         flag_path = askopenfilename(title="选择旗子图标", filetypes=[("PNG Files", "*.png")])
         if flag_path:
             global FLAG_IMAGE_PATH
+            # 旧图片不再使用；同一路径的文件可能已被修改，也要重新解码
+            self.image_cache.forget(FLAG_IMAGE_PATH)
+            self.image_cache.forget(flag_path)
             FLAG_IMAGE_PATH = flag_path
             self.flag_image = self.load_flag_image()
 
         bg_path = askopenfilename(title="选择背景图片", filetypes=[("PNG Files", "*.png")])
         if bg_path:
             global BACKGROUND_IMAGE_PATH
+            self.image_cache.forget(BACKGROUND_IMAGE_PATH)
+            self.image_cache.forget(bg_path)
             BACKGROUND_IMAGE_PATH = bg_path
             self.background_image = self.load_background_image()
 
+    def handle_background_event(self, event):
+        """处理后台任务完成的事件（资源预加载、图片平滑缩放），返回是否已处理
+
+        这些事件只发送一次，弹窗等模态界面的事件循环也要交给这里，否则资源永远不会接入。
+        """
+        if event.type == ASSETS_READY:
+            self.finish_asset_loading()
+        elif event.type == IMAGE_READY:
+            if event.path == BACKGROUND_IMAGE_PATH and event.size == (self.window_width, self.window_height):
+                self.background_image = self.load_background_image()
+                self.renderer.invalidate()
+        else:
+            return False
+        return True
+
+    def handle_event(self, event):
+        """处理一个输入或窗口事件"""
+        if not self.results_attached:
+            self.attach_results()  # 输入可能修改总积分，此前必须已读入结果库中的值
+        if event.type == QUIT:
+            self.quit_game()
+        if event.type == pygame.VIDEORESIZE:
+            self.window_width, self.window_height = event.size
+            self.screen = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
+            self.viewport.set_rect(self.viewport_rect(), self.board)
+            self.background_image = self.load_background_image(smooth=True)
+            self.renderer.invalidate()
+        elif event.type in (ASSETS_READY, IMAGE_READY):
+            self.handle_background_event(event)
+        elif event.type == pygame.WINDOWMINIMIZED:
+            self.window_minimized = True
+        elif event.type in (pygame.WINDOWRESTORED, pygame.WINDOWMAXIMIZED, pygame.WINDOWSHOWN):
+            self.window_minimized = False
+            self.renderer.invalidate()
+        elif event.type == pygame.WINDOWFOCUSLOST:
+            self.window_focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.window_focused = True
+            self.renderer.invalidate()
+        elif event.type == pygame.WINDOWEXPOSED:
+            # 窗口被遮挡后重新露出，即使没有焦点也要重绘一次
+            self.expose_pending = True
+            self.renderer.invalidate()
+        if event.type == MOUSEBUTTONDOWN:
+            x, y = event.pos
+            if y < self.header_height:
+                for btn_type, rect in self.buttons:
+                    if rect.collidepoint(x, y):
+                        if btn_type == "tool":
+                            self.tool_active = True
+                        elif btn_type == "reset":
+                            self.reset_game()
+                        elif btn_type == "save":
+                            self.save_game()
+                        elif btn_type == "load":
+                            self.load_game()
+                        elif btn_type == "config":
+                            self.config_screen()
+                            self.renderer.invalidate()
+                        elif btn_type == "customize":
+                            self.customize_resources()
+                            self.renderer.invalidate()
+                        elif btn_type == "open_resources":
+                            resource_dir = get_resource_path("")
+                            if os.name == 'nt':
+                                os.startfile(resource_dir)
+                            elif os.name == 'posix':
+                                import subprocess
+                                subprocess.call(['open', resource_dir])
+            else:
+                cell = self.viewport.cell_at((x, y), self.board)
+                if cell is None:
+                    return
+                board_x, board_y = cell
+                if event.button in (1, 2, 3):
+                    self.clicks += 1
+                if event.button == 1:  # 左键
+                    if self.tool_active:
+                        self.record(ACTION_TOOL, board_x, board_y)
+                        if self.use_tool(board_x, board_y):
+                            self.tool_active = False
+                    else:
+                        if self.first_click and self.start_cell is not None:
+                            # 无猜棋盘只保证从起点开局可解，首次点击总是从起点揭示
+                            board_x, board_y = self.start_cell
+                        self.record(ACTION_REVEAL, board_x, board_y)
+                        self.reveal(board_x, board_y)
+                elif event.button == 3:  # 右键
+                    self.record(ACTION_FLAG, board_x, board_y)
+                    self.toggle_flag(board_x, board_y)
+                elif event.button == 2:  # 中键
+                    self.record(ACTION_CHORD, board_x, board_y)
+                    self.reveal_around(board_x, board_y)
+        if event.type == MOUSEWHEEL:
+            # 滚轮上下滚动，按住Shift左右滚动，按住Ctrl缩放
+            mods = pygame.key.get_mods()
+            if mods & KMOD_CTRL:
+                self.zoom(pygame.mouse.get_pos(), ZOOM_STEP if event.y > 0 else 1 / ZOOM_STEP)
+            elif mods & KMOD_SHIFT:
+                self.scroll(-event.y * SCROLL_CELLS, 0)
+            else:
+                self.scroll(event.x * SCROLL_CELLS, -event.y * SCROLL_CELLS)
+        if event.type == KEYDOWN:
+            if event.key == K_F3:  # F3：性能浮层
+                self.perf.toggle()
+                self.renderer.invalidate()
+            elif event.key == K_F4 and self.perf.samples:  # F4：导出性能样本
+                path = datetime.datetime.now().strftime("perf_samples_%Y%m%d_%H%M%S.csv")
+                try:
+                    print(f"[INFO] 已导出 {self.perf.dump_csv(path)} 帧性能样本: {path}")
+                except Exception as e:
+                    print(f"[ERROR] 导出性能样本失败: {e}")
+            elif event.key == K_F5:  # F5：导出诊断报告（最近事件、帧耗时和当前对局录像）
+                try:
+                    self.show_message(f"诊断报告已保存: {generate_crash_report()}", 2000)
+                except Exception as e:
+                    print(f"[ERROR] 导出诊断报告失败: {e}")
+            elif event.key == K_z and event.mod & KMOD_CTRL:  # Ctrl+Z 撤销，Ctrl+Shift+Z 重做
+                if event.mod & KMOD_SHIFT:
+                    self.record(ACTION_REDO, 0, 0)
+                    self.redo()
+                else:
+                    self.record(ACTION_UNDO, 0, 0)
+                    self.undo()
+            elif event.key == K_y and event.mod & KMOD_CTRL:  # Ctrl+Y 重做
+                self.record(ACTION_REDO, 0, 0)
+                self.redo()
+            elif event.key == K_h:  # H键：提示
+                if not self.game_over and not self.win:
+                    self.hint(HINT_BUDGET)
+            elif event.key in (K_LEFT, K_RIGHT, K_UP, K_DOWN):  # 方向键：滚动
+                dx = (event.key == K_RIGHT) - (event.key == K_LEFT)
+                dy = (event.key == K_DOWN) - (event.key == K_UP)
+                self.scroll(dx * SCROLL_CELLS, dy * SCROLL_CELLS)
+            elif event.key in (K_EQUALS, K_PLUS, K_KP_PLUS):  # +/-：以视口中心缩放
+                self.zoom(self.viewport.rect.center, ZOOM_STEP)
+            elif event.key in (K_MINUS, K_KP_MINUS):
+                self.zoom(self.viewport.rect.center, 1 / ZOOM_STEP)
+    
+    def should_render(self):
+        """窗口最小化或失去焦点时不渲染（窗口重新露出时除外）"""
+        return not self.window_minimized and (self.window_focused or self.expose_pending)
+    
+    def next_wakeup_timeout(self):
+        """主循环在没有输入时最多等待的毫秒数；返回 None 表示一直等到下一个事件"""
+        timeouts = []
+        if self.perf.enabled and self.should_render():
+            timeouts.append(PERF_REFRESH_MS)  # 定时刷新性能浮层
+        if self.toasts.current or self.toasts.queue:
+            timeouts.append(self.toasts.next_timeout() or 1)  # 提示到期时醒来移除或换下一条
+        if self.unsaved_changes and not self.first_click and not self.game_over and not self.win:
+            timeouts.append(max(1, int((self.last_autosave + AUTOSAVE_INTERVAL - time.time()) * 1000)))
+        if self.should_render() and self.show_time and not self.first_click and not self.game_over and not self.win:
+            # 计时显示每秒变化一次，在下一个整秒时醒来
+            elapsed_ms = int((time.time() - self.start_time) * 1000)
+            timeouts.append(1000 - elapsed_ms % 1000)
+        return min(timeouts) if timeouts else None
+    
+    @staticmethod
+    def wait_events(timeout=None):
+        """休眠到有事件或超时（毫秒，None 表示一直等），返回这期间积累的所有事件"""
+        event = pygame.event.wait() if timeout is None else pygame.event.wait(timeout)
+        events = [e for e in [event] + pygame.event.get() if e.type != NOEVENT]
+        for e in events:
+            if e.type != MOUSEMOTION:
+                TELEMETRY.record("input", e)  # 事件对象原样保存，写报告时才格式化
+        return events
+    
     def run(self):
+        """事件驱动的主循环：没有输入时休眠，只在需要时醒来重绘"""
         clock = pygame.time.Clock()
+        with STARTUP_TIMER.measure("首帧"):
+            self.draw()
+        self.offer_recovery()
         while True:
-            for event in pygame.event.get():
-                if event.type == QUIT:
-                    pygame.quit()
-                    sys.exit()
-                if event.type == pygame.VIDEORESIZE:
-                    self.window_width, self.window_height = event.size
-                    self.screen = pygame.display.set_mode((self.window_width, self.window_height), pygame.RESIZABLE)
-                    self.background_image = self.load_background_image()
-                if event.type == MOUSEBUTTONDOWN:
-                    x, y = event.pos
-                    if y < self.header_height:
-                        for btn_type, rect in self.buttons:
-                            if rect.collidepoint(x, y):
-                                if btn_type == "tool":
-                                    self.tool_active = True
-                                elif btn_type == "reset":
-                                    self.reset_game()
-                                elif btn_type == "save":
-                                    self.save_game()
-                                elif btn_type == "load":
-                                    self.load_game()
-                                elif btn_type == "config":
-                                    self.config_screen()
-                                elif btn_type == "customize":
-                                    self.customize_resources()
-                                elif btn_type == "open_resources":
-                                    resource_dir = get_resource_path("")
-                                    if os.name == 'nt':
-                                        os.startfile(resource_dir)
-                                    elif os.name == 'posix':
-                                        subprocess.call(['open', resource_dir])
-                    else:
-                        board_x = (x - 10) // self.effective_cell_size
-                        board_y = (y - self.header_height - 10) // self.effective_cell_size
-                        if event.button == 1:  # 左键
-                            if self.tool_active:
-                                if self.use_tool(board_x, board_y):
-                                    self.tool_active = False
-                            else:
-                                self.reveal(board_x, board_y)
-                        elif event.button == 3:  # 右键
-                            self.toggle_flag(board_x, board_y)
-                        elif event.button == 2:  # 中键
-                            self.reveal_around(board_x, board_y)
+            events = self.wait_events(self.next_wakeup_timeout())
+            frame_start = time.perf_counter()
+            self.perf.begin_frame()
+            with self.perf.measure("events"):
+                for event in events:
+                    self.handle_event(event)
 
             if not self.game_over and not self.win:
-                self.win = self.check_win()
+                with self.perf.measure("check_win"):
+                    self.win = self.check_win()
                 if self.win:
+                    # 积分只在获胜时结算一次，而不是在每帧绘制时累加并写盘
+                    self.total_score += self.score
+                    self.record_result("win")
+                    self.save_score()
+                    self.discard_autosave()
+                    self.finish_recording()
+                    self.renderer.invalidate()
                     if not self.sound_manager.has_errors():
                         self.sound_manager.play("win")
 
-            self.draw()
-            clock.tick(60)
+            # 只自动存档进行中的对局；结束后的局面无需恢复
+            if (self.unsaved_changes and not self.first_click and not self.game_over and not self.win
+                    and time.time() - self.last_autosave >= AUTOSAVE_INTERVAL):
+                self.autosave()
+            
+            self.sound_manager.flush()
+            if self.toasts.update():
+                self.renderer.invalidate()  # 提示出现或消失
+            if self.should_render():
+                draw_start = time.perf_counter()
+                self.draw()
+                self.expose_pending = False
+                self.perf.end_frame()
+                frame_end = time.perf_counter()
+                TELEMETRY.record("frame", ((frame_end - frame_start) * 1000, (frame_end - draw_start) * 1000))
+            clock.tick(FRAME_RATE)
+
+STARTUP_TIMER.record("导入模块", time.perf_counter() - _IMPORT_START)
 
 if __name__ == "__main__":
+    if getattr(sys, "frozen", False):
+        # 打包后的程序中，无猜棋盘的工作进程需要由此进入（未打包时 freeze_support 什么都不做，不必导入）
+        from multiprocessing import freeze_support
+        freeze_support()
     game = Minesweeper()
     game.run()
\ No newline at end of file